@@ -3,21 +3,72 @@
 Генерация PDF статьи о проекте PowerBI Ontology Extractor
 """
 
+import copy
+
 from fpdf import FPDF
 from datetime import datetime
 
 
+# Шрифты с поддержкой кириллицы: (стиль, путь к TTF)
+FONT_FAMILY = 'DejaVu'
+FONT_FILES = (
+    ('', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'),
+    ('B', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('I', '/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf'),  # Using Serif for italic style
+)
+
+# Разобранные TTF-шрифты (fontkey -> TTFFont), общие для всех документов процесса
+_font_cache = {}
+
+
+def _load_fonts():
+    """Разбирает TTF-файлы один раз за процесс"""
+    if not _font_cache:
+        loader = FPDF()
+        for style, path in FONT_FILES:
+            loader.add_font(FONT_FAMILY, style, path)
+        _font_cache.update(loader.fonts)
+    return _font_cache
+
+
 class ArticlePDF(FPDF):
     """PDF документ со статьёй"""
 
     def __init__(self):
+        # Последний цвет текста, выставленный через set_text_color
+        self._text_color_args = None
+        self._text_color_obj = None
         super().__init__()
-        # Добавляем шрифт с поддержкой кириллицы
-        self.add_font('DejaVu', '', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
-        self.add_font('DejaVu', 'B', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
-        self.add_font('DejaVu', 'I', '/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf')  # Using Serif for italic style
+        # Копия разделяет разобранные таблицы шрифта (включая неизменяемые
+        # ширины символов и ID глифов), но ведёт свой набор глифов
+        for fontkey, font in _load_fonts().items():
+            shared = {id(font.cw): font.cw, id(font.glyph_ids): font.glyph_ids}
+            self.fonts[fontkey] = copy.deepcopy(font, shared)
         self.set_auto_page_break(auto=True, margin=20)
 
+    def set_font(self, family=None, style='', size=0):
+        """Выбор шрифта; повторный выбор уже активного шрифта пропускается"""
+        if (
+            family is not None
+            and family.lower() == self.font_family
+            and style == self.font_style
+            and size in (0, self.font_size_pt)
+            and not (self.underline or self.strikethrough)
+        ):
+            return
+        super().set_font(family, style, size)
+
+    def set_text_color(self, r, g=-1, b=-1):
+        """Цвет текста; повторная установка того же цвета пропускается"""
+        args = (r, g, b)
+        # Сравниваем и с фактическим состоянием: FPDF восстанавливает
+        # text_color напрямую при смене страницы
+        if args == self._text_color_args and self.text_color is self._text_color_obj:
+            return
+        super().set_text_color(r, g, b)
+        self._text_color_args = args
+        self._text_color_obj = self.text_color
+
     def header(self):
         self.set_font('DejaVu', 'I', 9)
         self.set_text_color(128, 128, 128)
@@ -84,12 +135,29 @@ class ArticlePDF(FPDF):
 
     def bullet_point(self, text):
         """Пункт списка"""
+        self.bullet_list([text])
+
+    def bullet_list(self, items):
+        """Список пунктов: стиль выставляется один раз на весь список"""
         self.set_font('DejaVu', '', 11)
         self.set_text_color(0, 0, 0)
         x = self.get_x()
-        self.cell(8, 6, '  •  ', new_x="RIGHT", new_y="TOP")
-        self.multi_cell(0, 6, text)
-        self.set_x(x)  # Reset X position
+        for text in items:
+            self.cell(8, 6, '  •  ', new_x="RIGHT", new_y="TOP")
+            self.multi_cell(0, 6, text)
+            self.set_x(x)  # Reset X position
+
+    def subheading(self, title):
+        """Подзаголовок внутри раздела"""
+        self.set_font('DejaVu', 'B', 11)
+        self.cell(0, 6, title)
+        self.ln(5)
+        self.set_font('DejaVu', '', 11)
+
+    def render_blocks(self, blocks):
+        """Выводит последовательность блоков (тип, содержимое)"""
+        for kind, payload in blocks:
+            BLOCK_RENDERERS[kind](self, payload)
 
     def code_block(self, code):
         """Блок кода"""
@@ -100,236 +168,270 @@ class ArticlePDF(FPDF):
         self.ln(3)
 
 
-def create_article():
-    """Создание статьи"""
-    pdf = ArticlePDF()
+# Обработчики блоков статьи: тип блока -> функция (pdf, содержимое)
+BLOCK_RENDERERS = {
+    'page': lambda pdf, _: pdf.add_page(),
+    'chapter': ArticlePDF.chapter_title,
+    'section': ArticlePDF.section_title,
+    'subheading': ArticlePDF.subheading,
+    'body': ArticlePDF.body_text,
+    'bullets': ArticlePDF.bullet_list,
+    'space': ArticlePDF.ln,
+}
 
-    # Титульная страница
-    pdf.title_page(
-        title="PowerBI Ontology Extractor",
-        subtitle="Инструмент для извлечения и управления\nонтологиями из моделей данных Power BI",
-        author="vladspace_ubuntu24",
-        date=datetime.now().strftime("%d %B %Y")
-    )
 
-    # Аннотация
-    pdf.add_page()
-    pdf.chapter_title("Аннотация")
-    pdf.body_text(
+# Аннотация
+ABSTRACT = (
+    ('page', None),
+    ('chapter', "Аннотация"),
+    ('body', (
         "В данной статье представлен инструмент PowerBI Ontology Extractor — программное "
         "решение для автоматического извлечения семантических метаданных из моделей данных "
         "Power BI и их преобразования в формат OWL-онтологий. Инструмент решает задачу "
         "формализации бизнес-знаний, заложенных в аналитических моделях, делая их доступными "
         "для семантического анализа, валидации и интеграции с системами искусственного интеллекта."
-    )
+    )),
+)
 
-    # Введение
-    pdf.chapter_title("1. Введение")
 
-    pdf.section_title("1.1 Проблематика")
-    pdf.body_text(
+# Введение
+INTRODUCTION = (
+    ('chapter', "1. Введение"),
+    ('section', "1.1 Проблематика"),
+    ('body', (
         "Современные организации накапливают значительный объём бизнес-знаний в своих "
         "аналитических платформах. Power BI, будучи одной из ведущих платформ бизнес-аналитики, "
         "содержит в своих моделях данных ценную семантическую информацию: структуру сущностей, "
         "связи между ними, бизнес-метрики и правила расчёта показателей."
-    )
-    pdf.body_text(
-        "Однако эта информация остаётся «замкнутой» внутри инструмента и недоступна для:"
-    )
-    pdf.bullet_point("Семантического анализа и рассуждений")
-    pdf.bullet_point("Интеграции с системами управления знаниями")
-    pdf.bullet_point("Валидации действий AI-агентов")
-    pdf.bullet_point("Автоматизированной проверки соответствия бизнес-правилам")
-
-    pdf.section_title("1.2 Предлагаемое решение")
-    pdf.body_text(
+    )),
+    ('body', "Однако эта информация остаётся «замкнутой» внутри инструмента и недоступна для:"),
+    ('bullets', (
+        "Семантического анализа и рассуждений",
+        "Интеграции с системами управления знаниями",
+        "Валидации действий AI-агентов",
+        "Автоматизированной проверки соответствия бизнес-правилам",
+    )),
+    ('section', "1.2 Предлагаемое решение"),
+    ('body', (
         "PowerBI Ontology Extractor автоматически извлекает метаданные из различных форматов "
         "Power BI моделей (PBIP/TMDL, BIM, VPAX) и генерирует формальные OWL-онтологии, "
         "которые могут быть использованы в системах семантического веба, knowledge graphs "
         "и AI-приложениях."
-    )
-
-    # Архитектура
-    pdf.chapter_title("2. Архитектура системы")
-
-    pdf.section_title("2.1 Ключевые компоненты")
-    pdf.body_text("Система состоит из четырёх основных компонентов:")
-    pdf.ln(3)
-
-    pdf.set_font('DejaVu', 'B', 11)
-    pdf.cell(0, 6, "Power BI Model Parser")
-    pdf.ln(5)
-    pdf.set_font('DejaVu', '', 11)
-    pdf.body_text(
+    )),
+)
+
+
+# Архитектура
+ARCHITECTURE = (
+    ('chapter', "2. Архитектура системы"),
+    ('section', "2.1 Ключевые компоненты"),
+    ('body', "Система состоит из четырёх основных компонентов:"),
+    ('space', 3),
+    ('subheading', "Power BI Model Parser"),
+    ('body', (
         "Модуль парсинга поддерживает три формата моделей Power BI: PBIP/TMDL (новый формат "
         "с разделением на файлы), BIM (JSON-представление табличной модели) и VPAX "
         "(XML-экспорт из DAX Studio). Парсер извлекает таблицы, колонки, меры, связи "
         "и иерархии из модели."
-    )
-
-    pdf.set_font('DejaVu', 'B', 11)
-    pdf.cell(0, 6, "OWL Ontology Generator")
-    pdf.ln(5)
-    pdf.set_font('DejaVu', '', 11)
-    pdf.body_text(
+    )),
+    ('subheading', "OWL Ontology Generator"),
+    ('body', (
         "Генератор преобразует извлечённые метаданные в OWL-онтологию с использованием "
         "библиотеки RDFLib. Сущности моделируются как OWL-классы с аннотациями типов данных, "
         "связи — как ObjectProperty, меры — как DatatypeProperty с формулами в rdfs:comment."
-    )
-
-    pdf.set_font('DejaVu', 'B', 11)
-    pdf.cell(0, 6, "Business Rules Engine")
-    pdf.ln(5)
-    pdf.set_font('DejaVu', '', 11)
-    pdf.body_text(
+    )),
+    ('subheading', "Business Rules Engine"),
+    ('body', (
         "Модуль позволяет определять бизнес-правила в формате OWL-ограничений и аннотаций. "
         "Поддерживаются ограничения кардинальности, допустимых значений, а также ролевые "
         "ограничения доступа для интеграции с системами безопасности."
-    )
-
-    pdf.set_font('DejaVu', 'B', 11)
-    pdf.cell(0, 6, "Ontology Chat (AI Q&A)")
-    pdf.ln(5)
-    pdf.set_font('DejaVu', '', 11)
-    pdf.body_text(
+    )),
+    ('subheading', "Ontology Chat (AI Q&A)"),
+    ('body', (
         "Интеллектуальный чат-интерфейс на базе OpenAI GPT-4o-mini, позволяющий задавать "
         "вопросы об онтологии на естественном языке. Поддерживает русский и английский языки, "
         "учитывает роль пользователя (Admin, Analyst, Viewer) при формировании ответов."
-    )
-
-    pdf.section_title("2.2 Технологический стек")
-    pdf.bullet_point("Python 3.10+ — основной язык разработки")
-    pdf.bullet_point("Streamlit — веб-интерфейс с 8 вкладками")
-    pdf.bullet_point("RDFLib — работа с RDF/OWL онтологиями")
-    pdf.bullet_point("OpenAI API — AI-функциональность чата")
-    pdf.bullet_point("Pydantic — валидация данных")
-
-    # Функциональные возможности
-    pdf.add_page()
-    pdf.chapter_title("3. Функциональные возможности")
-
-    pdf.section_title("3.1 Извлечение онтологий")
-    pdf.body_text("Система поддерживает автоматическое извлечение следующих элементов:")
-    pdf.bullet_point("Entities (сущности) — таблицы модели с типами колонок и описаниями")
-    pdf.bullet_point("Relationships (связи) — foreign key связи между таблицами")
-    pdf.bullet_point("Measures (меры) — DAX-формулы с метаданными форматирования")
-    pdf.bullet_point("Hierarchies (иерархии) — аналитические иерархии для drill-down")
-
-    pdf.section_title("3.2 Управление онтологиями")
-    pdf.body_text("Веб-интерфейс предоставляет полный набор инструментов:")
-    pdf.bullet_point("Создание и редактирование сущностей с атрибутами")
-    pdf.bullet_point("Визуальное управление связями между сущностями")
-    pdf.bullet_point("Настройка ролевых разрешений (CRUD per entity)")
-    pdf.bullet_point("Редактор бизнес-правил с OWL-аннотациями")
-    pdf.bullet_point("Предпросмотр OWL в форматах RDF/XML, Turtle, N-Triples")
-    pdf.bullet_point("Сравнение и слияние версий онтологий (Diff & Merge)")
-
-    pdf.section_title("3.3 AI-функциональность")
-    pdf.body_text(
+    )),
+    ('section', "2.2 Технологический стек"),
+    ('bullets', (
+        "Python 3.10+ — основной язык разработки",
+        "Streamlit — веб-интерфейс с 8 вкладками",
+        "RDFLib — работа с RDF/OWL онтологиями",
+        "OpenAI API — AI-функциональность чата",
+        "Pydantic — валидация данных",
+    )),
+)
+
+
+# Функциональные возможности
+FEATURES = (
+    ('page', None),
+    ('chapter', "3. Функциональные возможности"),
+    ('section', "3.1 Извлечение онтологий"),
+    ('body', "Система поддерживает автоматическое извлечение следующих элементов:"),
+    ('bullets', (
+        "Entities (сущности) — таблицы модели с типами колонок и описаниями",
+        "Relationships (связи) — foreign key связи между таблицами",
+        "Measures (меры) — DAX-формулы с метаданными форматирования",
+        "Hierarchies (иерархии) — аналитические иерархии для drill-down",
+    )),
+    ('section', "3.2 Управление онтологиями"),
+    ('body', "Веб-интерфейс предоставляет полный набор инструментов:"),
+    ('bullets', (
+        "Создание и редактирование сущностей с атрибутами",
+        "Визуальное управление связями между сущностями",
+        "Настройка ролевых разрешений (CRUD per entity)",
+        "Редактор бизнес-правил с OWL-аннотациями",
+        "Предпросмотр OWL в форматах RDF/XML, Turtle, N-Triples",
+        "Сравнение и слияние версий онтологий (Diff & Merge)",
+    )),
+    ('section', "3.3 AI-функциональность"),
+    ('body', (
         "Ontology Chat позволяет пользователям взаимодействовать с онтологией через "
         "естественный язык. Примеры запросов:"
-    )
-    pdf.bullet_point("«Какие сущности есть в онтологии?» — список всех entities")
-    pdf.bullet_point("«Покажи связи между таблицами» — таблица relationships")
-    pdf.bullet_point("«Опиши структуру модели данных» — развёрнутое описание архитектуры")
-    pdf.bullet_point("«Какие меры связаны с продажами?» — фильтрация по контексту")
-
-    # Интеграции
-    pdf.chapter_title("4. Интеграции")
-
-    pdf.section_title("4.1 OntoGuard AI")
-    pdf.body_text(
+    )),
+    ('bullets', (
+        "«Какие сущности есть в онтологии?» — список всех entities",
+        "«Покажи связи между таблицами» — таблица relationships",
+        "«Опиши структуру модели данных» — развёрнутое описание архитектуры",
+        "«Какие меры связаны с продажами?» — фильтрация по контексту",
+    )),
+)
+
+
+# Интеграции
+INTEGRATIONS = (
+    ('chapter', "4. Интеграции"),
+    ('section', "4.1 OntoGuard AI"),
+    ('body', (
         "Проект интегрируется с OntoGuard AI — семантическим файрволом для AI-агентов. "
         "Сгенерированные онтологии могут использоваться для валидации действий агентов "
         "на основе OWL-правил. Например, правило «только Admin может удалять записи» "
         "будет автоматически проверяться при каждом запросе агента."
-    )
-
-    pdf.section_title("4.2 Universal Agent Connector")
-    pdf.body_text(
+    )),
+    ('section', "4.2 Universal Agent Connector"),
+    ('body', (
         "Онтологии могут экспортироваться для использования в Universal Agent Connector — "
         "платформе для подключения AI-агентов к корпоративным базам данных. "
         "Это обеспечивает семантическую валидацию SQL-запросов и естественно-языковых "
         "команд на уровне бизнес-правил."
-    )
-
-    pdf.section_title("4.3 Knowledge Graphs")
-    pdf.body_text(
+    )),
+    ('section', "4.3 Knowledge Graphs"),
+    ('body', (
         "Экспортированные OWL-онтологии совместимы со стандартами семантического веба "
         "и могут загружаться в графовые базы данных (Neo4j, Amazon Neptune) для "
         "построения корпоративных knowledge graphs."
-    )
-
-    # Результаты
-    pdf.add_page()
-    pdf.chapter_title("5. Результаты и тестирование")
-
-    pdf.section_title("5.1 Статистика проекта")
-    pdf.bullet_point("14 реализованных задач (Tasks) — 100% completion")
-    pdf.bullet_point("~3000 строк Python кода")
-    pdf.bullet_point("10 ключевых функций")
-    pdf.bullet_point("8 вкладок пользовательского интерфейса")
-    pdf.bullet_point("Поддержка 3 форматов Power BI моделей")
-
-    pdf.section_title("5.2 Тестирование")
-    pdf.body_text("Система протестирована на реальных моделях Power BI:")
-    pdf.ln(3)
-
-    pdf.set_font('DejaVu', 'B', 11)
-    pdf.cell(0, 6, "Sales Returns Sample")
-    pdf.ln(5)
-    pdf.set_font('DejaVu', '', 11)
-    pdf.bullet_point("15 сущностей (таблиц)")
-    pdf.bullet_point("9 связей между таблицами")
-    pdf.bullet_point("Успешная генерация OWL-онтологии")
-    pdf.bullet_point("AI-чат отвечает на вопросы корректно")
-    pdf.ln(3)
-
-    pdf.set_font('DejaVu', 'B', 11)
-    pdf.cell(0, 6, "Adventure Works DW 2020")
-    pdf.ln(5)
-    pdf.set_font('DejaVu', '', 11)
-    pdf.bullet_point("11 сущностей")
-    pdf.bullet_point("13 связей")
-    pdf.bullet_point("Сложная star schema корректно преобразована")
-    pdf.bullet_point("Описание модели данных на английском языке")
-
-    pdf.section_title("5.3 Тестирование с Playwright MCP")
-    pdf.body_text(
+    )),
+)
+
+
+# Результаты
+RESULTS = (
+    ('page', None),
+    ('chapter', "5. Результаты и тестирование"),
+    ('section', "5.1 Статистика проекта"),
+    ('bullets', (
+        "14 реализованных задач (Tasks) — 100% completion",
+        "~3000 строк Python кода",
+        "10 ключевых функций",
+        "8 вкладок пользовательского интерфейса",
+        "Поддержка 3 форматов Power BI моделей",
+    )),
+    ('section', "5.2 Тестирование"),
+    ('body', "Система протестирована на реальных моделях Power BI:"),
+    ('space', 3),
+    ('subheading', "Sales Returns Sample"),
+    ('bullets', (
+        "15 сущностей (таблиц)",
+        "9 связей между таблицами",
+        "Успешная генерация OWL-онтологии",
+        "AI-чат отвечает на вопросы корректно",
+    )),
+    ('space', 3),
+    ('subheading', "Adventure Works DW 2020"),
+    ('bullets', (
+        "11 сущностей",
+        "13 связей",
+        "Сложная star schema корректно преобразована",
+        "Описание модели данных на английском языке",
+    )),
+    ('section', "5.3 Тестирование с Playwright MCP"),
+    ('body', (
         "Функциональное тестирование выполнено с использованием Playwright MCP — "
         "инструмента браузерной автоматизации от Microsoft. Все 8 вкладок интерфейса "
         "проверены, AI-чат протестирован на различных типах запросов (списки, таблицы, "
         "развёрнутые описания) на русском и английском языках."
-    )
+    )),
+)
 
-    # Заключение
-    pdf.chapter_title("6. Заключение")
-    pdf.body_text(
+
+# Заключение
+CONCLUSION = (
+    ('chapter', "6. Заключение"),
+    ('body', (
         "PowerBI Ontology Extractor решает актуальную задачу извлечения семантических знаний "
         "из аналитических моделей и их формализации в виде OWL-онтологий. Инструмент "
         "обеспечивает мост между миром бизнес-аналитики и семантическими технологиями, "
         "открывая возможности для:"
-    )
-    pdf.bullet_point("Построения корпоративных knowledge graphs на основе BI-моделей")
-    pdf.bullet_point("Семантической валидации действий AI-агентов")
-    pdf.bullet_point("Автоматизированной проверки соответствия бизнес-правилам")
-    pdf.bullet_point("Интеграции аналитических метаданных в системы управления знаниями")
-
-    pdf.ln(5)
-    pdf.body_text(
+    )),
+    ('bullets', (
+        "Построения корпоративных knowledge graphs на основе BI-моделей",
+        "Семантической валидации действий AI-агентов",
+        "Автоматизированной проверки соответствия бизнес-правилам",
+        "Интеграции аналитических метаданных в системы управления знаниями",
+    )),
+    ('space', 5),
+    ('body', (
         "Проект имеет открытый исходный код и доступен на GitHub. Дальнейшее развитие "
         "предполагает расширение поддержки форматов (Azure Analysis Services, SSAS), "
         "улучшение AI-функциональности и интеграцию с большим количеством семантических "
         "платформ."
+    )),
+)
+
+
+# Ссылки
+REFERENCES = (
+    ('chapter', "Ссылки"),
+    ('bullets', (
+        "GitHub: https://github.com/vpakspace/powerbi-ontology-extractor",
+        "OntoGuard AI: https://github.com/vpakspace/ontoguard-ai",
+        "Universal Agent Connector: https://github.com/vpakspace/universal-agent-connector",
+        "OWL Web Ontology Language: https://www.w3.org/OWL/",
+        "RDFLib Documentation: https://rdflib.readthedocs.io/",
+    )),
+)
+
+
+# Порядок глав статьи; каждая глава — кортеж блоков (тип, содержимое)
+CHAPTERS = (
+    ABSTRACT,
+    INTRODUCTION,
+    ARCHITECTURE,
+    FEATURES,
+    INTEGRATIONS,
+    RESULTS,
+    CONCLUSION,
+    REFERENCES,
+)
+
+
+def create_article():
+    """Создание статьи"""
+    pdf = ArticlePDF()
+
+    # Титульная страница
+    pdf.title_page(
+        title="PowerBI Ontology Extractor",
+        subtitle="Инструмент для извлечения и управления\nонтологиями из моделей данных Power BI",
+        author="vladspace_ubuntu24",
+        date=datetime.now().strftime("%d %B %Y")
     )
 
-    # Ссылки
-    pdf.chapter_title("Ссылки")
-    pdf.bullet_point("GitHub: https://github.com/vpakspace/powerbi-ontology-extractor")
-    pdf.bullet_point("OntoGuard AI: https://github.com/vpakspace/ontoguard-ai")
-    pdf.bullet_point("Universal Agent Connector: https://github.com/vpakspace/universal-agent-connector")
-    pdf.bullet_point("OWL Web Ontology Language: https://www.w3.org/OWL/")
-    pdf.bullet_point("RDFLib Documentation: https://rdflib.readthedocs.io/")
+    # Главы выводятся последовательно в один документ: они перетекают
+    # между страницами, а нумерация страниц сквозная
+    for chapter in CHAPTERS:
+        pdf.render_blocks(chapter)
 
     return pdf
 
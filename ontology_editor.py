@@ -12,35 +12,78 @@ A Streamlit-based GUI for:
 Run: streamlit run ontology_editor.py
 """
 
+import atexit
+import dataclasses
 import hashlib
-import json
 import logging
+import logging.handlers
 import tempfile
 import secrets
 import os
+import re
+import shutil
 import zipfile
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 
+import pandas as pd
 import streamlit as st
 
-# Audit logger for tracking user operations
+# Audit logger for tracking user operations. Records are buffered and written
+# in batches (immediately for warnings and above); the file is only opened
+# once the first batch is flushed.
 audit_logger = logging.getLogger("ontology_editor.audit")
 if not audit_logger.handlers:
     _log_dir = Path(__file__).parent / "data"
     _log_dir.mkdir(parents=True, exist_ok=True)
-    _handler = logging.FileHandler(str(_log_dir / "audit.log"), encoding="utf-8")
-    _handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    _file_handler = logging.FileHandler(str(_log_dir / "audit.log"), encoding="utf-8", delay=True)
+    _file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    _handler = logging.handlers.MemoryHandler(
+        capacity=64, flushLevel=logging.WARNING, target=_file_handler
+    )
     audit_logger.addHandler(_handler)
     audit_logger.setLevel(logging.INFO)
+    atexit.register(_handler.flush)
 
 # Security constants
 MAX_PBIX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
 MAX_CHAT_HISTORY = 50  # Maximum chat messages to retain in session
+CHAT_VISIBLE_MESSAGES = 20  # Chat messages rendered without expanding the history
+
+# UI limits
+MAX_PERMISSION_ENTITIES_SHOWN = 50  # Write-access widgets rendered per role
 
 # Default roles (single source of truth for the editor)
 DEFAULT_ROLES = ["Admin", "Analyst", "Viewer"]
 
+# Selectbox options (module-level so reruns don't rebuild them)
+ENTITY_TYPES = ("standard", "dimension", "fact", "bridge", "date")
+ENTITY_TYPE_INDEX = {t: i for i, t in enumerate(ENTITY_TYPES)}
+DATA_TYPES = ("String", "Integer", "Decimal", "Boolean", "DateTime", "Date")
+CONSTRAINT_TYPES = ("", "range", "regex", "enum")
+RELATIONSHIP_TYPES = ("has", "belongs_to", "contains", "related_to", "references")
+CARDINALITIES = ("one-to-many", "many-to-one", "many-to-many", "one-to-one")
+RULE_CLASSIFICATIONS = ("low", "medium", "high", "critical")
+# OWL Preview: syntax highlighting and download MIME type per rdflib format
+OWL_CODE_LANGUAGES = {"xml": "xml", "turtle": "turtle", "n3": "turtle", "nt": "text"}
+OWL_MIME_TYPES = {
+    "xml": "application/xml",
+    "turtle": "text/turtle",
+    "n3": "text/turtle",
+    "nt": "application/n-triples",
+}
+# Business rules data_editor: visible columns (source_measure is kept but hidden)
+RULE_EDITOR_COLUMNS = (
+    "severity", "name", "entity", "condition", "action", "classification", "priority", "description",
+)
+SEVERITY_ICONS = {
+    "low": "🟢",
+    "medium": "🟡",
+    "high": "🟠",
+    "critical": "🔴",
+}
+
 # Storage directory for auto-saved ontologies
 STORAGE_DIR = Path(__file__).parent / "data" / "ontologies"
 STORAGE_DIR.mkdir(parents=True, exist_ok=True)
@@ -52,10 +95,9 @@ def validate_pbix_upload(uploaded_file) -> str | None:
 
     Returns None if valid, or an error message string.
     """
-    # Check file size
-    uploaded_file.seek(0, os.SEEK_END)
-    size = uploaded_file.tell()
-    uploaded_file.seek(0)
+    # Check file size before touching the ZIP central directory
+    # (Streamlit's UploadedFile already knows its size)
+    size = uploaded_file.size
 
     if size > MAX_PBIX_FILE_SIZE:
         return f"File too large: {size / (1024*1024):.1f} MB (max {MAX_PBIX_FILE_SIZE // (1024*1024)} MB)"
@@ -66,17 +108,20 @@ def validate_pbix_upload(uploaded_file) -> str | None:
     # Validate ZIP structure (.pbix is a ZIP archive)
     try:
         with zipfile.ZipFile(uploaded_file) as zf:
-            for name in zf.namelist():
+            # Iterate the parsed ZipInfo list directly; namelist() would copy
+            # every name into a second list before the first check runs.
+            for info in zf.infolist():
+                name = info.filename
+                if not name:
+                    continue
                 # Reject path traversal attempts
-                if name.startswith('/') or '..' in name:
+                if name[0] == '/' or '..' in name:
                     return f"Rejected: suspicious path in archive: {name}"
                 # Reject absolute Windows paths
                 if len(name) > 1 and name[1] == ':':
                     return f"Rejected: absolute path in archive: {name}"
     except zipfile.BadZipFile:
         return "Invalid .pbix file: not a valid ZIP archive"
-    finally:
-        uploaded_file.seek(0)
 
     return None
 
@@ -88,15 +133,10 @@ from powerbi_ontology.ontology_generator import (
     BusinessRule,
     Constraint,
 )
-from powerbi_ontology.export.owl import OWLExporter
 from powerbi_ontology.contract_builder import ContractBuilder
 from powerbi_ontology.ontology_diff import OntologyDiff, OntologyMerge
 from powerbi_ontology.semantic_debt import SemanticDebtAnalyzer
-from powerbi_ontology.chat import create_chat
-
-# Load environment variables from .env file
-from dotenv import load_dotenv
-load_dotenv()
+from powerbi_ontology.utils import json_io
 
 # Page config
 st.set_page_config(
@@ -107,6 +147,57 @@ st.set_page_config(
 )
 
 
+@st.cache_resource(show_spinner=False)
+def _load_env() -> bool:
+    """Load environment variables from .env once per server process, not on every rerun."""
+    from dotenv import load_dotenv
+    return load_dotenv()
+
+
+_load_env()
+
+
+def _upload_digest(uploaded_file) -> str:
+    """Content hash of an uploaded file, read in 1 MB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(1024 * 1024), b""):
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _extract_pbix_ontology(content_digest: str, _uploaded_file) -> Ontology:
+    """
+    Extract an ontology from an uploaded .pbix file.
+
+    Memoized on the file's content digest, so uploading the same file again
+    (in any session) skips both the temp file and the extraction. Each call
+    returns its own copy, so edits to a loaded ontology never reach the cache.
+    """
+    from powerbi_ontology.extractor import PowerBIExtractor
+    from powerbi_ontology.ontology_generator import OntologyGenerator
+
+    temp_path = None
+    try:
+        # Save to temp file with unpredictable name and restrictive permissions
+        temp_dir = Path(tempfile.gettempdir())
+        temp_name = f"pbix_{secrets.token_hex(16)}.pbix"
+        temp_path = str(temp_dir / temp_name)
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        # Stream in 1 MB chunks rather than holding the whole upload in memory
+        _uploaded_file.seek(0)
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(_uploaded_file, f, 1024 * 1024)
+
+        semantic_model = PowerBIExtractor(temp_path).extract()
+        return OntologyGenerator(semantic_model).generate()
+    finally:
+        if temp_path:
+            Path(temp_path).unlink(missing_ok=True)
+
+
 def init_session_state():
     """Initialize session state variables."""
     if "ontology" not in st.session_state:
@@ -129,16 +220,29 @@ def init_session_state():
     if "chat_instance" not in st.session_state:
         st.session_state.chat_instance = None
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        # Ring buffer: the oldest messages drop off once MAX_CHAT_HISTORY is reached
+        st.session_state.chat_history = deque(maxlen=MAX_CHAT_HISTORY)
     if "chat_role" not in st.session_state:
         st.session_state.chat_role = "Analyst"
 
 
+# ASCII translation table for get_safe_filename: separators become "_",
+# characters other than letters, digits and "_-." are deleted.
+_FILENAME_TABLE = {
+    i: (chr(i) if chr(i).isalnum() or chr(i) in "_-." else None) for i in range(128)
+}
+_FILENAME_TABLE.update({ord(" "): "_", ord("/"): "_", ord("\\"): "_"})
+# Same rule for the full Unicode range: \w matches exactly str.isalnum() plus "_"
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w.-]")
+
+
 def get_safe_filename(name: str) -> str:
     """Convert ontology name to safe filename."""
-    # Replace unsafe characters
-    safe = name.replace(" ", "_").replace("/", "_").replace("\\", "_")
-    safe = "".join(c for c in safe if c.isalnum() or c in "_-.")
+    # Replace separators with "_" and drop other unsafe ASCII characters in C
+    safe = name.translate(_FILENAME_TABLE)
+    # Non-ASCII letters/digits are kept, anything else non-ASCII is dropped
+    if not safe.isascii():
+        safe = _UNSAFE_FILENAME_RE.sub("", safe)
     return safe[:100]  # Limit length
 
 
@@ -149,39 +253,54 @@ def autosave_ontology(ontology: Ontology) -> Path:
     filename = f"{safe_name}_{timestamp}.json"
     filepath = STORAGE_DIR / filename
 
-    # Convert ontology to JSON-serializable dict
-    data = ontology_to_dict(ontology)
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Ontology and its parts are dataclasses, which json_io serializes directly.
+    # History files are written compact (only user exports are indented) and
+    # atomically, so an interrupted save never leaves a truncated file behind.
+    tmp_path = filepath.with_suffix(".json.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(json_io.dumps(ontology))
+    os.replace(tmp_path, filepath)
 
     return filepath
 
 
+# Streamlit reruns the whole script on every widget interaction; cache the
+# directory scan briefly and clear it explicitly after saving.
+@st.cache_data(ttl=10, show_spinner=False)
 def get_recent_ontologies(limit: int = 10) -> list:
     """Get list of recently saved ontologies, sorted by modification time."""
+    # os.scandir reuses the directory listing for is_file()/stat(), and Path
+    # objects are only built for the entries actually returned.
     files = []
-    for f in STORAGE_DIR.glob("*.json"):
-        try:
-            stat = f.stat()
-            files.append({
-                "path": f,
-                "name": f.stem,
-                "modified": datetime.fromtimestamp(stat.st_mtime),
-                "size": stat.st_size,
-            })
-        except OSError:
-            continue
+    with os.scandir(STORAGE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, entry.path, stat.st_size))
 
     # Sort by modification time, newest first
-    files.sort(key=lambda x: x["modified"], reverse=True)
-    return files[:limit]
+    files.sort(key=lambda x: x[0], reverse=True)
+    recent = []
+    for mtime, path, size in files[:limit]:
+        path = Path(path)
+        recent.append({
+            "path": path,
+            "name": path.stem,
+            "modified": datetime.fromtimestamp(mtime),
+            "size": size,
+        })
+    return recent
 
 
 def load_from_storage(filepath: Path) -> Ontology:
     """Load ontology from storage file."""
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = json_io.load_path(filepath)
     return load_ontology_from_json(data)
 
 
@@ -198,47 +317,74 @@ def create_empty_ontology(name: str) -> Ontology:
     )
 
 
+def _entity_index(ontology: Ontology) -> dict:
+    """Map entity name to entity for O(1) lookups within a single rerun."""
+    return {e.name: e for e in ontology.entities}
+
+
+def _rules_from_records(records: list) -> list:
+    """Rebuild BusinessRule objects from business rules data_editor rows."""
+    rules = []
+    for row in records:
+        # Cells left empty in the editor come back as None/NaN
+        row = {k: v for k, v in row.items() if v is not None and v == v}
+        if not row.get("name"):
+            continue
+        rules.append(BusinessRule(
+            name=str(row["name"]),
+            entity=row.get("entity", ""),
+            condition=row.get("condition", ""),
+            action=row.get("action", ""),
+            classification=row.get("classification", ""),
+            description=row.get("description", ""),
+            priority=int(row.get("priority", 1)),
+            source_measure=row.get("source_measure", ""),
+        ))
+    return rules
+
+
+def _entity_prop_names(ontology: Ontology) -> dict:
+    """Map entity name to its property names (entity order preserved)."""
+    return {e.name: [p.name for p in e.properties] for e in ontology.entities}
+
+
+def _constraints_from_json(items) -> list:
+    """Build Constraint objects from their JSON dicts."""
+    return [
+        Constraint(
+            type=c.get("type", ""),
+            value=c.get("value"),
+            message=c.get("message", ""),
+        )
+        for c in items
+    ]
+
+
 def load_ontology_from_json(json_data: dict) -> Ontology:
     """Load ontology from JSON data."""
-    entities = []
-    for entity_data in json_data.get("entities", []):
-        properties = []
-        for prop_data in entity_data.get("properties", []):
-            constraints = []
-            for c in prop_data.get("constraints", []):
-                constraints.append(Constraint(
-                    type=c.get("type", ""),
-                    value=c.get("value"),
-                    message=c.get("message", ""),
-                ))
-            properties.append(OntologyProperty(
-                name=prop_data.get("name", ""),
-                data_type=prop_data.get("data_type", "String"),
-                required=prop_data.get("required", False),
-                unique=prop_data.get("unique", False),
-                constraints=constraints,
-                description=prop_data.get("description", ""),
-            ))
-
-        entity_constraints = []
-        for c in entity_data.get("constraints", []):
-            entity_constraints.append(Constraint(
-                type=c.get("type", ""),
-                value=c.get("value"),
-                message=c.get("message", ""),
-            ))
-
-        entities.append(OntologyEntity(
+    entities = [
+        OntologyEntity(
             name=entity_data.get("name", ""),
             description=entity_data.get("description", ""),
-            properties=properties,
-            constraints=entity_constraints,
+            properties=[
+                OntologyProperty(
+                    name=prop_data.get("name", ""),
+                    data_type=prop_data.get("data_type", "String"),
+                    required=prop_data.get("required", False),
+                    unique=prop_data.get("unique", False),
+                    constraints=_constraints_from_json(prop_data.get("constraints", ())),
+                    description=prop_data.get("description", ""),
+                )
+                for prop_data in entity_data.get("properties", ())
+            ],
+            constraints=_constraints_from_json(entity_data.get("constraints", ())),
             entity_type=entity_data.get("entity_type", "standard"),
-        ))
+        )
+        for entity_data in json_data.get("entities", ())
+    ]
 
-    relationships = []
-    for rel_data in json_data.get("relationships", []):
-        relationships.append(OntologyRelationship(
+    relationships = [
+        OntologyRelationship(
             from_entity=rel_data.get("from_entity", ""),
             to_entity=rel_data.get("to_entity", ""),
             from_property=rel_data.get("from_property", ""),
@@ -246,11 +392,12 @@ def load_ontology_from_json(json_data: dict) -> Ontology:
             relationship_type=rel_data.get("relationship_type", "related_to"),
             cardinality=rel_data.get("cardinality", "one-to-many"),
             description=rel_data.get("description", ""),
-        ))
+        )
+        for rel_data in json_data.get("relationships", ())
+    ]
 
-    business_rules = []
-    for rule_data in json_data.get("business_rules", []):
-        business_rules.append(BusinessRule(
+    business_rules = [
+        BusinessRule(
             name=rule_data.get("name", ""),
             entity=rule_data.get("entity", ""),
             condition=rule_data.get("condition", ""),
@@ -258,7 +405,9 @@ def load_ontology_from_json(json_data: dict) -> Ontology:
             classification=rule_data.get("classification", ""),
             description=rule_data.get("description", ""),
             priority=rule_data.get("priority", 1),
-        ))
+        )
+        for rule_data in json_data.get("business_rules", ())
+    ]
 
     return Ontology(
         name=json_data.get("name", "Unnamed"),
@@ -271,64 +420,67 @@ def load_ontology_from_json(json_data: dict) -> Ontology:
     )
 
 
-def ontology_to_dict(ontology: Ontology) -> dict:
-    """Convert ontology to JSON-serializable dict."""
-    return {
-        "name": ontology.name,
-        "version": ontology.version,
-        "source": ontology.source,
-        "entities": [
-            {
-                "name": e.name,
-                "description": e.description,
-                "entity_type": e.entity_type,
-                "properties": [
-                    {
-                        "name": p.name,
-                        "data_type": p.data_type,
-                        "required": p.required,
-                        "unique": p.unique,
-                        "description": p.description,
-                        "constraints": [
-                            {"type": c.type, "value": c.value, "message": c.message}
-                            for c in p.constraints
-                        ],
-                    }
-                    for p in e.properties
-                ],
-                "constraints": [
-                    {"type": c.type, "value": c.value, "message": c.message}
-                    for c in e.constraints
-                ],
-            }
-            for e in ontology.entities
-        ],
-        "relationships": [
-            {
-                "from_entity": r.from_entity,
-                "to_entity": r.to_entity,
-                "from_property": r.from_property,
-                "to_property": r.to_property,
-                "relationship_type": r.relationship_type,
-                "cardinality": r.cardinality,
-                "description": r.description,
-            }
-            for r in ontology.relationships
-        ],
-        "business_rules": [
-            {
-                "name": b.name,
-                "entity": b.entity,
-                "condition": b.condition,
-                "action": b.action,
-                "classification": b.classification,
-                "description": b.description,
-                "priority": b.priority,
-            }
-            for b in ontology.business_rules
-        ],
-        "metadata": ontology.metadata,
-    }
+@st.cache_data(show_spinner=False, max_entries=8)
+def _export_owl_xml(ontology_json: bytes, roles: tuple, _ontology: Ontology) -> str:
+    """
+    Export an ontology to OWL/XML, memoized on its serialized form and roles.
+
+    The leading underscore keeps Streamlit from hashing the Ontology object
+    itself; ontology_json is the cache key.
+    """
+    from powerbi_ontology.export.owl import OWLExporter
+
+    return OWLExporter(_ontology, default_roles=list(roles)).export(format="xml")
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _export_owl_preview(
+    ontology_json: bytes,
+    roles: tuple,
+    format: str,
+    include_action_rules: bool,
+    include_constraints: bool,
+    _ontology: Ontology,
+) -> tuple:
+    """
+    Export an ontology for the OWL Preview tab, returning (content, summary).
+
+    Memoized on the serialized ontology and every export option, so repeated
+    clicks or switching back to an earlier format reuse the previous result.
+    """
+    from powerbi_ontology.export.owl import OWLExporter
+
+    exporter = OWLExporter(
+        _ontology,
+        default_roles=list(roles),
+        include_action_rules=include_action_rules,
+        include_constraints=include_constraints,
+    )
+    owl_content = exporter.export(format=format)
+    return owl_content, exporter.get_export_summary()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _diff_ontologies(ours_json: bytes, theirs_json: bytes, _ours: Ontology, _theirs: Ontology):
+    """Diff two ontologies, memoized on their serialized content."""
+    return OntologyDiff(_ours, _theirs).diff()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _merge_ontologies(
+    ours_json: bytes, theirs_json: bytes, strategy: str, _ours: Ontology, _theirs: Ontology
+):
+    """Merge theirs into ours (ours is also the base), memoized per strategy."""
+    return OntologyMerge(base=_ours, ours=_ours, theirs=_theirs).merge(strategy=strategy)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _analyze_semantic_debt(ours_json: bytes, theirs_json: bytes, _ours: Ontology, _theirs: Ontology):
+    """Run semantic debt analysis over two ontologies, memoized on their content."""
+    analyzer = SemanticDebtAnalyzer()
+    analyzer.add_ontology(_ours.name, _ours)
+    analyzer.add_ontology(_theirs.name, _theirs)
+    return analyzer.analyze()
 
 
 def render_sidebar():
@@ -351,18 +503,19 @@ def render_sidebar():
 
         # Export buttons
         if st.sidebar.button("📥 Export JSON", use_container_width=True):
-            json_str = json.dumps(ontology_to_dict(ont), indent=2)
+            json_bytes = json_io.dumps(ont, indent=True)
             st.sidebar.download_button(
                 "Download JSON",
-                json_str,
+                json_bytes,
                 f"{ont.name}.json",
                 "application/json",
                 use_container_width=True,
             )
 
         if st.sidebar.button("📥 Export OWL", use_container_width=True):
-            exporter = OWLExporter(ont, default_roles=st.session_state.roles)
-            owl_content = exporter.export(format="xml")
+            owl_content = _export_owl_xml(
+                json_io.dumps(ont), tuple(st.session_state.roles), ont
+            )
             audit_logger.info(f"OWL exported: {ont.name} ({len(owl_content)} bytes)")
             st.sidebar.download_button(
                 "Download OWL",
@@ -377,6 +530,7 @@ def render_sidebar():
         # Autosave button
         if st.sidebar.button("💾 Save to History", use_container_width=True):
             filepath = autosave_ontology(ont)
+            get_recent_ontologies.clear()
             audit_logger.info(f"Ontology saved: {ont.name} → {filepath.name}")
             st.sidebar.success(f"Saved: {filepath.name}")
 
@@ -434,7 +588,7 @@ def render_load_tab():
         uploaded_json = st.file_uploader("Upload JSON", type=["json"])
         if uploaded_json:
             try:
-                json_data = json.load(uploaded_json)
+                json_data = json_io.loads(uploaded_json.getvalue())
                 st.session_state.ontology = load_ontology_from_json(json_data)
                 st.success(f"Loaded: {st.session_state.ontology.name}")
                 st.rerun()
@@ -456,25 +610,11 @@ def render_load_tab():
                 if validation_error:
                     st.error(f"Upload rejected: {validation_error}")
                 else:
-                    temp_path = None
                     try:
-                        # Save to temp file with unpredictable name and restrictive permissions
-                        temp_dir = Path(tempfile.gettempdir())
-                        temp_name = f"pbix_{secrets.token_hex(16)}.pbix"
-                        temp_path = str(temp_dir / temp_name)
-                        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
-                        with os.fdopen(fd, 'wb') as f:
-                            f.write(uploaded_pbix.read())
-
-                        # Try to extract
-                        from powerbi_ontology.extractor import PowerBIExtractor
-                        from powerbi_ontology.ontology_generator import OntologyGenerator
-
                         with st.spinner(f"Extracting {uploaded_pbix.name}..."):
-                            extractor = PowerBIExtractor(temp_path)
-                            semantic_model = extractor.extract()
-                            generator = OntologyGenerator(semantic_model)
-                            st.session_state.ontology = generator.generate()
+                            st.session_state.ontology = _extract_pbix_ontology(
+                                _upload_digest(uploaded_pbix), uploaded_pbix
+                            )
 
                         # Mark file as loaded to prevent re-processing
                         st.session_state.loaded_file = file_key
@@ -484,9 +624,6 @@ def render_load_tab():
                     except Exception as e:
                         audit_logger.warning(f"PBIX upload failed: {uploaded_pbix.name} — {e}")
                         st.error(f"Error extracting from PBIX: {e}")
-                    finally:
-                        if temp_path:
-                            Path(temp_path).unlink(missing_ok=True)
 
 
 def render_entities_tab():
@@ -498,6 +635,8 @@ def render_entities_tab():
         return
 
     ont = st.session_state.ontology
+    # Built once per rerun for O(1) uniqueness checks and selection lookup
+    entity_index = _entity_index(ont)
 
     # Entity list
     col1, col2 = st.columns([1, 3])
@@ -511,11 +650,11 @@ def render_entities_tab():
             new_entity_desc = st.text_area("Description", key="new_entity_desc", height=68)
             new_entity_type = st.selectbox(
                 "Type",
-                ["standard", "dimension", "fact", "bridge", "date"],
+                ENTITY_TYPES,
                 key="new_entity_type",
             )
             if st.button("Add Entity"):
-                if new_entity_name and new_entity_name not in [e.name for e in ont.entities]:
+                if new_entity_name and new_entity_name not in entity_index:
                     ont.entities.append(OntologyEntity(
                         name=new_entity_name,
                         description=new_entity_desc,
@@ -544,10 +683,7 @@ def render_entities_tab():
 
     with col2:
         if st.session_state.selected_entity:
-            entity = next(
-                (e for e in ont.entities if e.name == st.session_state.selected_entity),
-                None,
-            )
+            entity = entity_index.get(st.session_state.selected_entity)
             if entity:
                 render_entity_editor(entity)
 
@@ -565,13 +701,14 @@ def render_entity_editor(entity: OntologyEntity):
         )
         entity.entity_type = st.selectbox(
             "Entity Type",
-            ["standard", "dimension", "fact", "bridge", "date"],
-            index=["standard", "dimension", "fact", "bridge", "date"].index(entity.entity_type or "standard"),
+            ENTITY_TYPES,
+            index=ENTITY_TYPE_INDEX.get(entity.entity_type or "standard", 0),
             key=f"type_{entity.name}",
         )
 
     # Properties
     st.subheader("Properties")
+    prop_names = {p.name for p in entity.properties}
 
     # Add property
     with st.expander("➕ Add Property"):
@@ -580,7 +717,7 @@ def render_entity_editor(entity: OntologyEntity):
             new_prop_name = st.text_input("Property Name", key="new_prop_name")
             new_prop_type = st.selectbox(
                 "Data Type",
-                ["String", "Integer", "Decimal", "Boolean", "DateTime", "Date"],
+                DATA_TYPES,
                 key="new_prop_type",
             )
         with prop_col2:
@@ -589,7 +726,7 @@ def render_entity_editor(entity: OntologyEntity):
         new_prop_desc = st.text_input("Description", key="new_prop_desc")
 
         if st.button("Add Property"):
-            if new_prop_name and new_prop_name not in [p.name for p in entity.properties]:
+            if new_prop_name and new_prop_name not in prop_names:
                 entity.properties.append(OntologyProperty(
                     name=new_prop_name,
                     data_type=new_prop_type,
@@ -605,7 +742,7 @@ def render_entity_editor(entity: OntologyEntity):
 
     # List properties
     if entity.properties:
-        for prop in entity.properties:
+        for prop_idx, prop in enumerate(entity.properties):
             with st.expander(f"📌 {prop.name} ({prop.data_type})", expanded=False):
                 col1, col2, col3 = st.columns([2, 1, 1])
                 with col1:
@@ -631,7 +768,7 @@ def render_entity_editor(entity: OntologyEntity):
                 st.caption("Constraints")
                 constraint_type = st.selectbox(
                     "Add Constraint",
-                    ["", "range", "regex", "enum"],
+                    CONSTRAINT_TYPES,
                     key=f"constraint_type_{entity.name}_{prop.name}",
                 )
                 if constraint_type == "range":
@@ -674,7 +811,7 @@ def render_entity_editor(entity: OntologyEntity):
 
                 # Delete button
                 if st.button("🗑️ Delete Property", key=f"del_prop_{entity.name}_{prop.name}"):
-                    entity.properties.remove(prop)
+                    del entity.properties[prop_idx]
                     st.rerun()
     else:
         st.info("No properties. Add one above.")
@@ -693,7 +830,31 @@ def render_entity_editor(entity: OntologyEntity):
         st.rerun()
 
 
-def render_relationships_tab():
+def _add_relationship():
+    """on_click callback: add a relationship from the form's widget values."""
+    state = st.session_state
+    from_entity, to_entity = state.rel_from, state.rel_to
+    if from_entity and to_entity and from_entity != to_entity:
+        state.ontology.relationships.append(OntologyRelationship(
+            from_entity=from_entity,
+            to_entity=to_entity,
+            from_property=state.rel_from_prop,
+            to_property=state.rel_to_prop,
+            relationship_type=state.rel_type,
+            cardinality=state.rel_cardinality,
+            description=state.rel_desc,
+        ))
+        st.toast(f"Added relationship: {from_entity} → {to_entity}")
+    else:
+        st.toast("Select different from/to entities.")
+
+
+def _delete_relationship(index: int):
+    """on_click callback: delete the relationship at index."""
+    del st.session_state.ontology.relationships[index]
+
+
+def render_relationships_tab(entity_props: dict):
     """Render Relationships editing tab."""
     st.header("🔗 Relationships")
 
@@ -702,7 +863,7 @@ def render_relationships_tab():
         return
 
     ont = st.session_state.ontology
-    entity_names = [e.name for e in ont.entities]
+    entity_names = list(entity_props)
 
     if not entity_names:
         st.warning("Add entities first before creating relationships.")
@@ -713,45 +874,29 @@ def render_relationships_tab():
         col1, col2, col3 = st.columns(3)
         with col1:
             from_entity = st.selectbox("From Entity", entity_names, key="rel_from")
-            from_entity_obj = next((e for e in ont.entities if e.name == from_entity), None)
-            from_props = [p.name for p in from_entity_obj.properties] if from_entity_obj else []
-            from_prop = st.selectbox("From Property", [""] + from_props, key="rel_from_prop")
+            from_props = entity_props.get(from_entity, [])
+            st.selectbox("From Property", [""] + from_props, key="rel_from_prop")
 
         with col2:
-            rel_type = st.selectbox(
+            st.selectbox(
                 "Relationship Type",
-                ["has", "belongs_to", "contains", "related_to", "references"],
+                RELATIONSHIP_TYPES,
                 key="rel_type",
             )
-            cardinality = st.selectbox(
+            st.selectbox(
                 "Cardinality",
-                ["one-to-many", "many-to-one", "many-to-many", "one-to-one"],
+                CARDINALITIES,
                 key="rel_cardinality",
             )
 
         with col3:
             to_entity = st.selectbox("To Entity", entity_names, key="rel_to")
-            to_entity_obj = next((e for e in ont.entities if e.name == to_entity), None)
-            to_props = [p.name for p in to_entity_obj.properties] if to_entity_obj else []
-            to_prop = st.selectbox("To Property", [""] + to_props, key="rel_to_prop")
-
-        rel_desc = st.text_input("Description", key="rel_desc")
-
-        if st.button("Add Relationship", type="primary"):
-            if from_entity and to_entity and from_entity != to_entity:
-                ont.relationships.append(OntologyRelationship(
-                    from_entity=from_entity,
-                    to_entity=to_entity,
-                    from_property=from_prop,
-                    to_property=to_prop,
-                    relationship_type=rel_type,
-                    cardinality=cardinality,
-                    description=rel_desc,
-                ))
-                st.success(f"Added relationship: {from_entity} → {to_entity}")
-                st.rerun()
-            else:
-                st.error("Select different from/to entities.")
+            to_props = entity_props.get(to_entity, [])
+            st.selectbox("To Property", [""] + to_props, key="rel_to_prop")
+
+        st.text_input("Description", key="rel_desc")
+
+        st.button("Add Relationship", type="primary", on_click=_add_relationship)
 
     # List relationships
     st.subheader("Existing Relationships")
@@ -768,14 +913,30 @@ def render_relationships_tab():
                 if rel.description:
                     st.write(f"**Description:** {rel.description}")
 
-                if st.button("🗑️ Delete", key=f"del_rel_{i}"):
-                    ont.relationships.remove(rel)
-                    st.rerun()
+                st.button("🗑️ Delete", key=f"del_rel_{i}", on_click=_delete_relationship, args=(i,))
     else:
         st.info("No relationships defined.")
 
 
-def render_permissions_tab():
+def _split_csv(text: str) -> list:
+    """Split a comma-separated widget value into its non-empty, stripped items."""
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def _update_roles():
+    """on_click callback: replace the role list from the roles text input."""
+    state = st.session_state
+    state.roles = _split_csv(state.roles_input)
+    st.toast(f"Roles updated: {state.roles}")
+
+
+def _update_execute_actions(role: str):
+    """on_change callback: store the role's execute actions from its text input."""
+    state = st.session_state
+    state.permissions[role]["execute"] = _split_csv(state[f"execute_{role}"])
+
+
+def render_permissions_tab(entity_props: dict):
     """Render Permissions (RBAC) editing tab."""
     st.header("🔐 Permissions")
 
@@ -784,7 +945,7 @@ def render_permissions_tab():
         return
 
     ont = st.session_state.ontology
-    entity_names = [e.name for e in ont.entities]
+    entity_names = list(entity_props)
 
     if not entity_names:
         st.warning("Add entities first before configuring permissions.")
@@ -792,13 +953,12 @@ def render_permissions_tab():
 
     # Roles management
     with st.expander("👥 Manage Roles"):
-        roles_str = st.text_input(
+        st.text_input(
             "Roles (comma-separated)",
             value=", ".join(st.session_state.roles),
+            key="roles_input",
         )
-        if st.button("Update Roles"):
-            st.session_state.roles = [r.strip() for r in roles_str.split(",") if r.strip()]
-            st.success(f"Roles updated: {st.session_state.roles}")
+        st.button("Update Roles", on_click=_update_roles)
 
     st.subheader("Permission Matrix")
     st.caption("Configure read/write/execute permissions for each role × entity")
@@ -833,31 +993,45 @@ def render_permissions_tab():
 
             # Write permissions
             st.write("**Write Access**")
-            for entity_name in entity_names:
-                entity = next((e for e in ont.entities if e.name == entity_name), None)
-                if entity:
-                    prop_names = [p.name for p in entity.properties]
-                    if prop_names:
-                        write_props = st.multiselect(
-                            f"{entity_name} properties",
-                            prop_names,
-                            default=perms["write"].get(entity_name, []),
-                            key=f"write_{role}_{entity_name}",
-                        )
-                        if write_props:
-                            perms["write"][entity_name] = write_props
-                        elif entity_name in perms["write"]:
-                            del perms["write"][entity_name]
+            # Only the filtered slice gets widgets; permissions of hidden
+            # entities are left untouched in perms["write"].
+            write_filter = st.text_input(
+                "Filter entities",
+                key=f"write_filter_{role}",
+                placeholder="Type to narrow the list...",
+            ).strip().lower()
+            shown = [n for n in entity_names if write_filter in n.lower()] if write_filter else entity_names
+            if len(shown) > MAX_PERMISSION_ENTITIES_SHOWN:
+                st.caption(
+                    f"Showing {MAX_PERMISSION_ENTITIES_SHOWN} of {len(shown)} entities. "
+                    "Use the filter to find others."
+                )
+                shown = shown[:MAX_PERMISSION_ENTITIES_SHOWN]
+            for entity_name in shown:
+                prop_names = entity_props[entity_name]
+                if prop_names:
+                    write_props = st.multiselect(
+                        f"{entity_name} properties",
+                        prop_names,
+                        default=perms["write"].get(entity_name, []),
+                        key=f"write_{role}_{entity_name}",
+                    )
+                    if write_props:
+                        perms["write"][entity_name] = write_props
+                    elif entity_name in perms["write"]:
+                        del perms["write"][entity_name]
 
             # Execute permissions
             st.write("**Execute Actions**")
-            actions_input = st.text_input(
+            # Parsed only when the text actually changes, not on every rerun
+            st.text_input(
                 "Custom actions (comma-separated)",
                 value=", ".join(perms["execute"]),
                 key=f"execute_{role}",
                 placeholder="approve_order, send_notification, ...",
+                on_change=_update_execute_actions,
+                args=(role,),
             )
-            perms["execute"] = [a.strip() for a in actions_input.split(",") if a.strip()]
 
     # Generate contract preview
     st.divider()
@@ -890,7 +1064,27 @@ def render_permissions_tab():
             st.error(f"Error generating contract: {e}")
 
 
-def render_business_rules_tab():
+def _add_business_rule():
+    """on_click callback: add a business rule from the form's widget values."""
+    state = st.session_state
+    if state.rule_name:
+        state.ontology.business_rules.append(BusinessRule(
+            name=state.rule_name,
+            entity=state.rule_entity,
+            condition=state.rule_condition,
+            action=state.rule_action,
+            classification=state.rule_class,
+            description=state.rule_desc,
+            priority=int(state.rule_priority),
+        ))
+        # New rows must not be replayed against the rules data_editor's old deltas
+        state.rules_editor_rev = state.get("rules_editor_rev", 0) + 1
+        st.toast(f"Added rule: {state.rule_name}")
+    else:
+        st.toast("Rule name required.")
+
+
+def render_business_rules_tab(entity_props: dict):
     """Render Business Rules editing tab."""
     st.header("📜 Business Rules")
 
@@ -899,66 +1093,63 @@ def render_business_rules_tab():
         return
 
     ont = st.session_state.ontology
-    entity_names = [e.name for e in ont.entities]
+    entity_names = list(entity_props)
 
     # Add rule
     with st.expander("➕ Add Business Rule", expanded=True):
         col1, col2 = st.columns(2)
         with col1:
-            rule_name = st.text_input("Rule Name", key="rule_name")
-            rule_entity = st.selectbox("Applies to Entity", [""] + entity_names, key="rule_entity")
-            rule_condition = st.text_input("Condition (DAX/expression)", key="rule_condition")
+            st.text_input("Rule Name", key="rule_name")
+            st.selectbox("Applies to Entity", [""] + entity_names, key="rule_entity")
+            st.text_input("Condition (DAX/expression)", key="rule_condition")
         with col2:
-            rule_action = st.text_input("Action", key="rule_action", placeholder="RequireApproval")
-            rule_class = st.selectbox(
+            st.text_input("Action", key="rule_action", placeholder="RequireApproval")
+            st.selectbox(
                 "Classification",
-                ["low", "medium", "high", "critical"],
+                RULE_CLASSIFICATIONS,
                 key="rule_class",
             )
-            rule_priority = st.number_input("Priority", min_value=1, max_value=10, value=1, key="rule_priority")
-
-        rule_desc = st.text_area("Description", key="rule_desc", height=68)
-
-        if st.button("Add Rule", type="primary"):
-            if rule_name:
-                ont.business_rules.append(BusinessRule(
-                    name=rule_name,
-                    entity=rule_entity,
-                    condition=rule_condition,
-                    action=rule_action,
-                    classification=rule_class,
-                    description=rule_desc,
-                    priority=int(rule_priority),
-                ))
-                st.success(f"Added rule: {rule_name}")
-                st.rerun()
-            else:
-                st.error("Rule name required.")
+            st.number_input("Priority", min_value=1, max_value=10, value=1, key="rule_priority")
+
+        st.text_area("Description", key="rule_desc", height=68)
+
+        st.button("Add Rule", type="primary", on_click=_add_business_rule)
 
     # List rules
     st.subheader("Existing Rules")
 
     if ont.business_rules:
-        for i, rule in enumerate(ont.business_rules):
-            severity_colors = {
-                "low": "🟢",
-                "medium": "🟡",
-                "high": "🟠",
-                "critical": "🔴",
-            }
-            icon = severity_colors.get(rule.classification, "⚪")
-
-            with st.expander(f"{icon} {rule.name} ({rule.entity})"):
-                st.write(f"**Condition:** `{rule.condition}`")
-                st.write(f"**Action:** {rule.action}")
-                st.write(f"**Classification:** {rule.classification}")
-                st.write(f"**Priority:** {rule.priority}")
-                if rule.description:
-                    st.write(f"**Description:** {rule.description}")
-
-                if st.button("🗑️ Delete", key=f"del_rule_{i}"):
-                    ont.business_rules.remove(rule)
-                    st.rerun()
+        # One data_editor widget for all rules instead of an expander and a
+        # delete button per rule. Edits are staged in the editor and written
+        # back on "Apply"; the editor key is then bumped so its stored row
+        # deltas are not replayed against the updated rules.
+        rules_df = pd.DataFrame(
+            [
+                {"severity": SEVERITY_ICONS.get(r.classification, "⚪"), **dataclasses.asdict(r)}
+                for r in ont.business_rules
+            ]
+        )
+        editor_rev = st.session_state.get("rules_editor_rev", 0)
+        edited_df = st.data_editor(
+            rules_df,
+            key=f"rules_editor_{editor_rev}",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_order=RULE_EDITOR_COLUMNS,
+            disabled=["severity"],
+            column_config={
+                "severity": st.column_config.TextColumn("", width="small"),
+                "classification": st.column_config.SelectboxColumn(options=RULE_CLASSIFICATIONS),
+                "priority": st.column_config.NumberColumn(min_value=1, max_value=10, step=1),
+            },
+        )
+        st.caption("Edit cells or select rows and press Delete, then apply.")
+
+        if st.button("💾 Apply Rule Changes"):
+            ont.business_rules = _rules_from_records(edited_df.to_dict("records"))
+            st.session_state.rules_editor_rev = editor_rev + 1
+            st.rerun()
     else:
         st.info("No business rules defined.")
 
@@ -974,27 +1165,35 @@ def render_owl_preview_tab():
     ont = st.session_state.ontology
 
     # Export options
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         format_choice = st.selectbox("Format", ["xml", "turtle", "n3"])
     with col2:
         include_actions = st.checkbox("Include Action Rules", value=True)
     with col3:
         include_constraints = st.checkbox("Include Constraints", value=True)
+    with col4:
+        # N-Triples skips the prefix/qname work the pretty serializers do,
+        # which dominates export time on large ontologies.
+        fast_mode = st.checkbox(
+            "Fast mode (N-Triples)",
+            value=False,
+            help="Much faster for large ontologies; overrides the format above",
+        )
+    if fast_mode:
+        format_choice = "nt"
 
     # Generate preview
     if st.button("Generate OWL", type="primary"):
         try:
-            exporter = OWLExporter(
+            owl_content, summary = _export_owl_preview(
+                json_io.dumps(ont),
+                tuple(st.session_state.roles),
+                format_choice,
+                include_actions,
+                include_constraints,
                 ont,
-                default_roles=st.session_state.roles,
-                include_action_rules=include_actions,
-                include_constraints=include_constraints,
             )
-            owl_content = exporter.export(format=format_choice)
-
-            # Summary
-            summary = exporter.get_export_summary()
 
             col1, col2, col3, col4 = st.columns(4)
             col1.metric("Triples", summary["total_triples"])
@@ -1003,14 +1202,14 @@ def render_owl_preview_tab():
             col4.metric("Action Rules", summary["action_rules"])
 
             # Code preview
-            st.code(owl_content, language="xml" if format_choice == "xml" else "turtle")
+            st.code(owl_content, language=OWL_CODE_LANGUAGES[format_choice])
 
             # Download
             st.download_button(
                 "📥 Download OWL",
                 owl_content,
                 f"{ont.name}.owl",
-                "application/xml" if format_choice == "xml" else "text/turtle",
+                OWL_MIME_TYPES[format_choice],
                 use_container_width=True,
             )
         except Exception as e:
@@ -1038,7 +1237,7 @@ def render_diff_merge_tab():
         uploaded_json = st.file_uploader("Upload JSON ontology", type=["json"], key="diff_json")
         if uploaded_json:
             try:
-                json_data = json.load(uploaded_json)
+                json_data = json_io.loads(uploaded_json.getvalue())
                 st.session_state.compare_ontology = load_ontology_from_json(json_data)
                 st.success(f"Loaded: {st.session_state.compare_ontology.name}")
             except Exception as e:
@@ -1049,28 +1248,16 @@ def render_diff_merge_tab():
         if uploaded_pbix:
             file_key = f"diff_{uploaded_pbix.name}_{uploaded_pbix.size}"
             if st.session_state.get("diff_loaded_file") != file_key:
-                temp_path = None
                 try:
-                    with tempfile.NamedTemporaryFile(suffix=".pbix", delete=False) as f:
-                        f.write(uploaded_pbix.read())
-                        temp_path = f.name
-
-                    from powerbi_ontology.extractor import PowerBIExtractor
-                    from powerbi_ontology.ontology_generator import OntologyGenerator
-
                     with st.spinner(f"Extracting {uploaded_pbix.name}..."):
-                        extractor = PowerBIExtractor(temp_path)
-                        semantic_model = extractor.extract()
-                        generator = OntologyGenerator(semantic_model)
-                        st.session_state.compare_ontology = generator.generate()
+                        st.session_state.compare_ontology = _extract_pbix_ontology(
+                            _upload_digest(uploaded_pbix), uploaded_pbix
+                        )
 
                     st.session_state["diff_loaded_file"] = file_key
                     st.success(f"Extracted: {st.session_state.compare_ontology.name}")
                 except Exception as e:
                     st.error(f"Error extracting from PBIX: {e}")
-                finally:
-                    if temp_path:
-                        Path(temp_path).unlink(missing_ok=True)
 
     # Show comparison info
     if st.session_state.compare_ontology:
@@ -1084,8 +1271,9 @@ def render_diff_merge_tab():
 
         if st.button("🔍 Run Diff", type="primary"):
             try:
-                differ = OntologyDiff(ont, comp)
-                st.session_state.diff_report = differ.diff()
+                st.session_state.diff_report = _diff_ontologies(
+                    json_io.dumps(ont), json_io.dumps(comp), ont, comp
+                )
                 st.success("Diff completed!")
             except Exception as e:
                 st.error(f"Error running diff: {e}")
@@ -1125,12 +1313,9 @@ def render_diff_merge_tab():
 
         if st.button("🔀 Run Merge", type="primary"):
             try:
-                merger = OntologyMerge(
-                    base=ont,
-                    ours=ont,
-                    theirs=comp
+                merged, conflicts = _merge_ontologies(
+                    json_io.dumps(ont), json_io.dumps(comp), merge_strategy, ont, comp
                 )
-                merged, conflicts = merger.merge(strategy=merge_strategy)
                 st.session_state.merged_ontology = merged
 
                 st.success(f"Merge completed! Result: {len(merged.entities)} entities")
@@ -1169,10 +1354,9 @@ def render_diff_merge_tab():
 
         if st.button("🔍 Analyze Conflicts"):
             try:
-                analyzer = SemanticDebtAnalyzer()
-                analyzer.add_ontology(ont.name, ont)
-                analyzer.add_ontology(comp.name, comp)
-                debt_report = analyzer.analyze()
+                debt_report = _analyze_semantic_debt(
+                    json_io.dumps(ont), json_io.dumps(comp), ont, comp
+                )
 
                 st.metric("Total Conflicts", debt_report.total_conflicts)
 
@@ -1211,9 +1395,15 @@ OPENAI_API_KEY=sk-your-actual-key-here
         """)
         return
 
-    # Initialize chat instance
+    # st.tabs renders every tab on each rerun, so the chat backend is only
+    # created once the user actually opens a chat here.
     if st.session_state.chat_instance is None:
+        st.info(f"👋 Chat about **{ont.name}** with an AI assistant.")
+        if not st.button("▶️ Start Chat", type="primary"):
+            return
         try:
+            from powerbi_ontology.chat import create_chat
+
             st.session_state.chat_instance = create_chat()
         except Exception as e:
             st.error(f"Error initializing chat: {e}")
@@ -1247,15 +1437,15 @@ OPENAI_API_KEY=sk-your-actual-key-here
         st.divider()
         st.subheader("💡 Suggestions")
         suggestions = chat.get_suggestions(ont)
-        for suggestion in suggestions[:4]:
-            sug_key = hashlib.md5(suggestion.encode("utf-8")).hexdigest()[:8]
-            if st.button(suggestion[:30] + "..." if len(suggestion) > 30 else suggestion, key=f"sug_{sug_key}"):
+        # Suggestion slots are positional, so the index is a stable, unique key
+        for i, suggestion in enumerate(suggestions[:4]):
+            if st.button(suggestion[:30] + "..." if len(suggestion) > 30 else suggestion, key=f"sug_{i}"):
                 st.session_state.pending_question = suggestion
 
         # Clear history button
         st.divider()
         if st.button("🗑️ Clear Chat", use_container_width=True):
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
             chat.clear_history()
             st.rerun()
 
@@ -1268,7 +1458,15 @@ OPENAI_API_KEY=sk-your-actual-key-here
                 st.info(f"👋 Ask me anything about **{ont.name}**!")
                 st.caption("Examples: 'What entities exist?', 'How are Customer and Sales related?'")
             else:
-                for msg in st.session_state.chat_history:
+                # Only the most recent messages are rendered by default, so the
+                # per-rerun cost stays flat as the history grows.
+                history = list(st.session_state.chat_history)
+                older_count = max(0, len(history) - CHAT_VISIBLE_MESSAGES)
+                if older_count and not st.checkbox(
+                    f"Show {older_count} older messages", key="chat_show_older"
+                ):
+                    history = history[older_count:]
+                for msg in history:
                     if msg["role"] == "user":
                         st.chat_message("user").write(msg["content"])
                     else:
@@ -1283,22 +1481,31 @@ OPENAI_API_KEY=sk-your-actual-key-here
             initial_value = st.session_state.pending_question
             del st.session_state.pending_question
 
-        # Question input
-        question = st.text_input(
-            "Your question",
-            value=initial_value,
-            placeholder="Ask about entities, relationships, measures...",
-            key="chat_input",
-        )
+        # Question input. Inside a form, typing does not trigger reruns;
+        # the script only reruns when the question is submitted.
+        with st.form("chat_form", clear_on_submit=True):
+            question = st.text_input(
+                "Your question",
+                value=initial_value,
+                placeholder="Ask about entities, relationships, measures...",
+                key="chat_input",
+            )
 
-        col_send, col_spacer = st.columns([1, 4])
-        with col_send:
-            send_clicked = st.button("🚀 Send", type="primary", use_container_width=True)
+            col_send, col_spacer = st.columns([1, 4])
+            with col_send:
+                send_clicked = st.form_submit_button("🚀 Send", type="primary", use_container_width=True)
 
         if send_clicked and question:
             # Add user message
             st.session_state.chat_history.append({"role": "user", "content": question})
 
+            # The chat reuses its ontology context between questions; entities
+            # are edited in place here, so drop it when the content changed.
+            ont_digest = hashlib.blake2b(json_io.dumps(ont), digest_size=16).digest()
+            if st.session_state.get("chat_ontology_digest") != ont_digest:
+                chat.invalidate_context()
+                st.session_state.chat_ontology_digest = ont_digest
+
             # Get AI response
             with st.spinner("Thinking..."):
                 try:
@@ -1312,10 +1519,6 @@ OPENAI_API_KEY=sk-your-actual-key-here
                     error_msg = f"Error: {str(e)}"
                     st.session_state.chat_history.append({"role": "assistant", "content": error_msg})
 
-            # Trim chat history to prevent memory leak
-            if len(st.session_state.chat_history) > MAX_CHAT_HISTORY:
-                st.session_state.chat_history = st.session_state.chat_history[-MAX_CHAT_HISTORY:]
-
             st.rerun()
 
 
@@ -1342,14 +1545,19 @@ def main():
     with tabs[1]:
         render_entities_tab()
 
+    # Entity/property names shared by the next three tabs, built once per
+    # rerun. Any add/delete above ends in st.rerun(), so this is current.
+    ont = st.session_state.ontology
+    entity_props = _entity_prop_names(ont) if ont else {}
+
     with tabs[2]:
-        render_relationships_tab()
+        render_relationships_tab(entity_props)
 
     with tabs[3]:
-        render_permissions_tab()
+        render_permissions_tab(entity_props)
 
     with tabs[4]:
-        render_business_rules_tab()
+        render_business_rules_tab(entity_props)
 
     with tabs[5]:
         render_owl_preview_tab()
@@ -5,16 +5,22 @@ Analyzes multiple Power BI semantic models to detect conflicts and calculate sem
 """
 
 import logging
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
 
 from powerbi_ontology.extractor import SemanticModel, Measure
-from powerbi_ontology.dax_parser import DAXParser
+from powerbi_ontology.dax_parser import parser as dax_parser
+from powerbi_ontology.utils.compat import dataclass_options
 
 logger = logging.getLogger(__name__)
 
+# Result objects are created in bulk and never modified
+_RESULT_DATACLASS_OPTIONS = dataclass_options(frozen=True)
 
-@dataclass
+
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class Conflict:
     """Represents a semantic conflict between dashboards."""
     concept: str  # e.g., "HighRiskCustomer"
@@ -26,7 +32,7 @@ class Conflict:
     description: str = ""
 
 
-@dataclass
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class Duplication:
     """Represents duplicated logic across dashboards."""
     measure_name: str
@@ -35,7 +41,7 @@ class Duplication:
     description: str = ""
 
 
-@dataclass
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class CanonicalEntity:
     """Suggested canonical definition for an entity."""
     name: str
@@ -45,7 +51,7 @@ class CanonicalEntity:
     confidence: float = 0.0
 
 
-@dataclass
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class SemanticDebtReport:
     """Report of semantic debt calculation."""
     total_conflicts: int
@@ -65,16 +71,64 @@ class SemanticAnalyzer:
     - Suggest canonical definitions
     """
 
-    def __init__(self, semantic_models: List[SemanticModel]):
+    def __init__(
+        self,
+        semantic_models: Optional[Iterable[SemanticModel]] = None,
+        keep_models: bool = False,
+    ):
         """
         Initialize analyzer.
         
         Args:
-            semantic_models: List of semantic models to analyze
+            semantic_models: Semantic models to analyze. May be any iterable
+                (e.g. a generator yielding models as they are extracted);
+                more models can be added later with add_model().
+            keep_models: Keep every added model in semantic_models. By
+                default only the measures and entities needed for analysis
+                are indexed, so each model can be freed once it is added.
+        """
+        self.keep_models = keep_models
+        self.semantic_models: List[SemanticModel] = []
+        self.model_count = 0
+        self.dax_parser = dax_parser
+        # Concept indexes, filled incrementally by add_model()
+        self._measures_by_name: Dict[str, List[tuple]] = {}  # name -> [(source_file, measure), ...]
+        self._entities_by_name: Dict[str, List[tuple]] = {}  # name -> [(source_file, entity), ...]
+        self._measures_by_formula: Dict[str, List[tuple]] = {}  # normalized formula -> [(source_file, measure), ...]
+        self._conflicts_cache: Optional[List[Conflict]] = None
+        self._duplications_cache: Optional[List[Duplication]] = None
+        
+        for model in semantic_models or []:
+            self.add_model(model)
+
+    def add_model(self, model: SemanticModel):
+        """
+        Add a semantic model and index its measures and entities.
+        
+        Models are indexed as they arrive, so extraction and indexing can be
+        interleaved instead of collecting every model up front. Unless the
+        analyzer was created with keep_models=True, no reference to the model
+        itself is kept.
+        
+        Args:
+            model: Semantic model to add
         """
-        self.semantic_models = semantic_models
-        self.dax_parser = DAXParser()
-        self._model_map = {model.source_file: model for model in semantic_models}
+        if self.keep_models:
+            self.semantic_models.append(model)
+        self.model_count += 1
+        source_file = model.source_file
+        
+        for measure in model.measures:
+            self._measures_by_name.setdefault(measure.name.lower(), []).append((source_file, measure))
+            # Normalize formula (remove whitespace, case-insensitive)
+            normalized = self._normalize_formula(measure.dax_formula)
+            self._measures_by_formula.setdefault(normalized, []).append((source_file, measure))
+        for entity in model.entities:
+            self._entities_by_name.setdefault(entity.name.lower(), []).append((source_file, entity))
+        
+        # Invalidate results computed for the previous set of models
+        self._conflicts_cache = None
+        self._duplications_cache = None
 
     def detect_conflicts(self) -> List[Conflict]:
         """
@@ -88,68 +142,72 @@ class SemanticAnalyzer:
         Returns:
             List of Conflict objects
         """
-        conflicts = []
+        if self._conflicts_cache is None:
+            conflicts = list(self.iter_conflicts())
+            logger.info(f"Detected {len(conflicts)} conflicts")
+            self._conflicts_cache = conflicts
+        return list(self._conflicts_cache)
+
+    def iter_conflicts(self) -> Iterator[Conflict]:
+        """
+        Lazily yield conflicting definitions across dashboards.
         
-        # Group measures by name (case-insensitive)
-        measures_by_name: Dict[str, List[tuple]] = {}  # name -> [(model, measure), ...]
+        Conflicts are produced concept by concept from the analyzer's
+        indexes, so callers that only need the first few (e.g. for display)
+        do not pay for the full detection. Yields from the cached result if
+        detect_conflicts() has already run.
         
-        for model in self.semantic_models:
-            for measure in model.measures:
-                measure_key = measure.name.lower()
-                if measure_key not in measures_by_name:
-                    measures_by_name[measure_key] = []
-                measures_by_name[measure_key].append((model, measure))
+        Yields:
+            Conflict objects, in the same order as detect_conflicts()
+        """
+        if self._conflicts_cache is not None:
+            yield from self._conflicts_cache
+            return
         
-        # Find conflicts: same measure name, different definitions
-        for measure_name, measure_list in measures_by_name.items():
-            if len(measure_list) > 1:
-                # Compare all pairs
-                for i, (model1, measure1) in enumerate(measure_list):
-                    for model2, measure2 in measure_list[i+1:]:
-                        if measure1.dax_formula != measure2.dax_formula:
-                            # Conflict detected!
-                            conflict = Conflict(
-                                concept=measure_name,
-                                dashboard1=model1.source_file,
-                                definition1=measure1.dax_formula,
-                                dashboard2=model2.source_file,
-                                definition2=measure2.dax_formula,
-                                severity=self._determine_severity(measure1.dax_formula, measure2.dax_formula),
-                                description=f"'{measure_name}' defined differently in {model1.source_file} vs {model2.source_file}"
-                            )
-                            conflicts.append(conflict)
+        # Find conflicts: same measure name, different definitions.
+        # Each definition is reduced to a signature once; concepts whose
+        # definitions all share a single signature are skipped without any
+        # pairwise comparison.
+        for measure_name, measure_list in self._measures_by_name.items():
+            signatures = [measure.dax_formula for _, measure in measure_list]
+            if len(set(signatures)) < 2:
+                continue
+            for i, j in self._conflicting_pairs(signatures):
+                source1, measure1 = measure_list[i]
+                source2, measure2 = measure_list[j]
+                conflict = Conflict(
+                    concept=measure_name,
+                    dashboard1=source1,
+                    definition1=measure1.dax_formula,
+                    dashboard2=source2,
+                    definition2=measure2.dax_formula,
+                    severity=self._determine_severity(measure1.dax_formula, measure2.dax_formula),
+                    description=f"'{measure_name}' defined differently in {source1} vs {source2}"
+                )
+                yield conflict
         
         # Also check for entity definition conflicts
-        entities_by_name: Dict[str, List[tuple]] = {}
-        for model in self.semantic_models:
-            for entity in model.entities:
-                entity_key = entity.name.lower()
-                if entity_key not in entities_by_name:
-                    entities_by_name[entity_key] = []
-                entities_by_name[entity_key].append((model, entity))
-        
-        for entity_name, entity_list in entities_by_name.items():
-            if len(entity_list) > 1:
-                # Check for property differences
-                for i, (model1, entity1) in enumerate(entity_list):
-                    for model2, entity2 in entity_list[i+1:]:
-                        props1 = {p.name: p.data_type for p in entity1.properties}
-                        props2 = {p.name: p.data_type for p in entity2.properties}
-                        
-                        if props1 != props2:
-                            conflict = Conflict(
-                                concept=entity_name,
-                                dashboard1=model1.source_file,
-                                definition1=f"{len(entity1.properties)} properties",
-                                dashboard2=model2.source_file,
-                                definition2=f"{len(entity2.properties)} properties",
-                                severity="MEDIUM",
-                                description=f"Entity '{entity_name}' has different properties across dashboards"
-                            )
-                            conflicts.append(conflict)
-        
-        logger.info(f"Detected {len(conflicts)} conflicts")
-        return conflicts
+        for entity_name, entity_list in self._entities_by_name.items():
+            # Signature: the property name -> data type mapping
+            signatures = [
+                frozenset({p.name: p.data_type for p in entity.properties}.items())
+                for _, entity in entity_list
+            ]
+            if len(set(signatures)) < 2:
+                continue
+            for i, j in self._conflicting_pairs(signatures):
+                source1, entity1 = entity_list[i]
+                source2, entity2 = entity_list[j]
+                conflict = Conflict(
+                    concept=entity_name,
+                    dashboard1=source1,
+                    definition1=f"{len(entity1.properties)} properties",
+                    dashboard2=source2,
+                    definition2=f"{len(entity2.properties)} properties",
+                    severity="MEDIUM",
+                    description=f"Entity '{entity_name}' has different properties across dashboards"
+                )
+                yield conflict
 
     def identify_duplicate_logic(self) -> List[Duplication]:
         """
@@ -158,23 +216,15 @@ class SemanticAnalyzer:
         Returns:
             List of Duplication objects
         """
-        duplications = []
+        if self._duplications_cache is not None:
+            return list(self._duplications_cache)
         
-        # Group measures by formula (normalized)
-        measures_by_formula: Dict[str, List[tuple]] = {}
-        
-        for model in self.semantic_models:
-            for measure in model.measures:
-                # Normalize formula (remove whitespace, case-insensitive)
-                normalized = self._normalize_formula(measure.dax_formula)
-                if normalized not in measures_by_formula:
-                    measures_by_formula[normalized] = []
-                measures_by_formula[normalized].append((model, measure))
+        duplications = []
         
         # Find duplications (same formula, different names or dashboards)
-        for formula, measure_list in measures_by_formula.items():
+        for formula, measure_list in self._measures_by_formula.items():
             if len(measure_list) > 1:
-                dashboards = [model.source_file for model, _ in measure_list]
+                dashboards = [source_file for source_file, _ in measure_list]
                 measure_names = [measure.name for _, measure in measure_list]
                 
                 # Check if same name or different names
@@ -197,7 +247,8 @@ class SemanticAnalyzer:
                 duplications.append(duplication)
         
         logger.info(f"Identified {len(duplications)} duplications")
-        return duplications
+        self._duplications_cache = duplications
+        return list(duplications)
 
     def calculate_semantic_debt(self) -> SemanticDebtReport:
         """
@@ -246,41 +297,29 @@ class SemanticAnalyzer:
         """
         canonical_entities = []
         
-        # Group measures by name
-        measures_by_name: Dict[str, List[tuple]] = {}
-        for model in self.semantic_models:
-            for measure in model.measures:
-                key = measure.name.lower()
-                if key not in measures_by_name:
-                    measures_by_name[key] = []
-                measures_by_name[key].append((model, measure))
-        
         # For each measure with multiple definitions, suggest canonical
-        for measure_name, measure_list in measures_by_name.items():
+        for measure_name, measure_list in self._measures_by_name.items():
             if len(measure_list) > 1:
-                # Find most common definition
-                formula_counts: Dict[str, int] = {}
-                for model, measure in measure_list:
-                    normalized = self._normalize_formula(measure.dax_formula)
-                    formula_counts[normalized] = formula_counts.get(normalized, 0) + 1
+                # Normalize each formula once and count occurrences
+                normalized_formulas = [
+                    self._normalize_formula(measure.dax_formula)
+                    for _, measure in measure_list
+                ]
+                formula_counts = Counter(normalized_formulas)
                 
                 # Most common is the suggested canonical
-                most_common_formula = max(formula_counts.items(), key=lambda x: x[1])
-                suggested_def = most_common_formula[0]
-                confidence = most_common_formula[1] / len(measure_list)
+                suggested_def, count = max(formula_counts.items(), key=lambda x: x[1])
+                confidence = count / len(measure_list)
                 
-                # Get dashboards using this definition
-                dashboards_using = [
-                    model.source_file for model, measure in measure_list
-                    if self._normalize_formula(measure.dax_formula) == suggested_def
-                ]
-                
-                # Get alternative definitions
+                # Split dashboards into those using the canonical definition
+                # and alternatives
+                dashboards_using = []
                 alternative_defs = {}
-                for model, measure in measure_list:
-                    normalized = self._normalize_formula(measure.dax_formula)
-                    if normalized != suggested_def:
-                        alternative_defs[model.source_file] = measure.dax_formula
+                for (source_file, measure), normalized in zip(measure_list, normalized_formulas):
+                    if normalized == suggested_def:
+                        dashboards_using.append(source_file)
+                    else:
+                        alternative_defs[source_file] = measure.dax_formula
                 
                 canonical = CanonicalEntity(
                     name=measure_name,
@@ -306,16 +345,37 @@ class SemanticAnalyzer:
         debt_report = self.calculate_semantic_debt()
         canonical_defs = self.suggest_canonical_definitions()
         
-        # Generate HTML report
-        html = self._generate_html_report(
+        # Generate HTML report, writing it chunk by chunk instead of
+        # building the whole document in memory
+        chunks = self._iter_html_report(
             conflicts, duplications, debt_report, canonical_defs
         )
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+            f.writelines(chunks)
         
         logger.info(f"Generated consolidation report: {output_path}")
 
+    @staticmethod
+    def _conflicting_pairs(signatures: List[Hashable]) -> List[Tuple[int, int]]:
+        """
+        Return index pairs (i, j), i < j, whose signatures differ.
+
+        Definitions are bucketed by signature so that only members of
+        different buckets are paired; identical definitions are never compared.
+        """
+        buckets: Dict[Hashable, List[int]] = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            buckets[signature].append(index)
+
+        pairs = []
+        for group1, group2 in combinations(buckets.values(), 2):
+            for i in group1:
+                for j in group2:
+                    pairs.append((i, j) if i < j else (j, i))
+        pairs.sort()
+        return pairs
+
     def _determine_severity(self, formula1: str, formula2: str) -> str:
         """Determine conflict severity based on formula differences."""
         # Simple heuristic
@@ -340,15 +400,15 @@ class SemanticAnalyzer:
         normalized = formula.replace(" ", "").replace("\n", "").replace("\t", "").lower()
         return normalized
 
-    def _generate_html_report(
+    def _iter_html_report(
         self,
         conflicts: List[Conflict],
         duplications: List[Duplication],
         debt_report: SemanticDebtReport,
         canonical_defs: List[CanonicalEntity]
-    ) -> str:
-        """Generate HTML report."""
-        html = f"""
+    ) -> Iterator[str]:
+        """Generate HTML report as a stream of chunks (one per section/item)."""
+        yield f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -377,7 +437,9 @@ class SemanticAnalyzer:
     </div>
     
     <h2>Conflicts Detected ({len(conflicts)})</h2>
-    {"".join(f'''
+    """
+        for conflict in conflicts:
+            yield f"""
     <div class="conflict">
         <h3>{conflict.concept}</h3>
         <p><strong>Severity:</strong> {conflict.severity}</p>
@@ -385,17 +447,23 @@ class SemanticAnalyzer:
         <p><strong>{conflict.dashboard2}:</strong> {conflict.definition2}</p>
         <p>{conflict.description}</p>
     </div>
-    ''' for conflict in conflicts)}
+    """
+        
+        yield f"""
     
     <h2>Duplications Identified ({len(duplications)})</h2>
-    {"".join(f'''
+    """
+        for dup in duplications:
+            yield f"""
     <div class="duplication">
         <h3>{dup.measure_name}</h3>
         <p><strong>Dashboards:</strong> {', '.join(dup.dashboards)}</p>
         <p><strong>Formula:</strong> <code>{dup.dax_formula}</code></p>
         <p>{dup.description}</p>
     </div>
-    ''' for dup in duplications)}
+    """
+        
+        yield f"""
     
     <h2>Canonical Definition Suggestions ({len(canonical_defs)})</h2>
     <table>
@@ -405,16 +473,19 @@ class SemanticAnalyzer:
             <th>Confidence</th>
             <th>Dashboards Using</th>
         </tr>
-        {"".join(f'''
+        """
+        for canon in canonical_defs:
+            yield f"""
         <tr>
             <td>{canon.name}</td>
             <td><code>{canon.suggested_definition[:100]}...</code></td>
             <td>{canon.confidence:.0%}</td>
             <td>{len(canon.dashboards_using)}</td>
         </tr>
-        ''' for canon in canonical_defs)}
+        """
+        
+        yield """
     </table>
 </body>
 </html>
         """
-        return html
@@ -5,49 +5,243 @@ Allows users to ask questions about loaded ontologies in natural language.
 Uses OpenAI API (or compatible) to generate answers based on ontology context.
 """
 
+import functools
 import logging
 import os
+import re
 import time
-from typing import Any, Optional, List, Dict
+from collections import deque
+from itertools import islice
+from typing import Any, ClassVar, Deque, Iterator, Optional, List, Dict
 from dataclasses import dataclass, field
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# tiktoken gives exact token counts: pip install powerbi-ontology-extractor[fast]
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
 from .ontology_generator import Ontology
+from .utils.compat import dataclass_options
+
+# Default token budget for chat history sent with each question
+HISTORY_TOKEN_BUDGET = 2000
+
+# Long sessions hold many messages
+_CHAT_DATACLASS_OPTIONS = dataclass_options()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str) -> Any:
+    """Get the tiktoken encoding for a model, or None if it cannot be loaded."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Unknown to tiktoken (e.g. a local Ollama model)
+        pass
+    except Exception as e:
+        logger.debug(f"Could not load tiktoken encoding for {model}: {e}")
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline
+        logger.debug(f"Could not load tiktoken encoding cl100k_base: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Count the tokens in text for a model.
 
+    Uses tiktoken when it is installed and falls back to an estimate of one
+    token per four characters otherwise.
+    """
+    encoding = _get_encoding(model) if model else None
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
 
-@dataclass
+
+@dataclass(**_CHAT_DATACLASS_OPTIONS)
 class ChatMessage:
     """Represents a single chat message."""
     role: str  # "user" or "assistant"
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
+    token_count: int = 0
 
 
-@dataclass
+@dataclass(**_CHAT_DATACLASS_OPTIONS)
 class ChatSession:
     """Manages chat history for a session."""
-    messages: List[ChatMessage] = field(default_factory=list)
+    # Oldest messages are dropped once a session holds this many
+    MAX_HISTORY: ClassVar[int] = 200
+
+    messages: Deque[ChatMessage] = field(
+        default_factory=lambda: deque(maxlen=ChatSession.MAX_HISTORY)
+    )
     ontology_name: str = ""
     user_role: str = "Analyst"
+    model: str = ""  # used to count message tokens
 
     def add_message(self, role: str, content: str) -> ChatMessage:
         """Add a message to the chat history."""
-        msg = ChatMessage(role=role, content=content)
+        msg = ChatMessage(
+            role=role,
+            content=content,
+            token_count=count_tokens(content, self.model),
+        )
         self.messages.append(msg)
         return msg
 
-    def get_history(self, limit: int = 10) -> List[Dict[str, str]]:
-        """Get recent chat history in OpenAI format."""
-        recent = self.messages[-limit:] if limit else self.messages
-        return [{"role": m.role, "content": m.content} for m in recent]
+    def get_history(
+        self,
+        limit: int = 10,
+        max_tokens: Optional[int] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Get recent chat history in OpenAI format.
+
+        Args:
+            limit: Maximum number of messages (0 for no limit)
+            max_tokens: Maximum total tokens; older messages are dropped first
+
+        Returns:
+            List of {"role", "content"} dicts, oldest first
+        """
+        # Walk back from the newest message so only the returned tail is visited
+        history = []
+        total = 0
+        for m in islice(reversed(self.messages), limit or None):
+            if max_tokens is not None:
+                total += m.token_count
+                if total > max_tokens:
+                    break
+            history.append({"role": m.role, "content": m.content})
+        history.reverse()
+        return history
 
     def clear(self) -> None:
         """Clear chat history."""
         self.messages.clear()
 
 
+@functools.lru_cache(maxsize=8)
+def _get_openai_client(api_key: Optional[str], base_url: Optional[str]) -> Any:
+    """
+    Create an OpenAI client, cached per (api_key, base_url).
+
+    Clients are thread-safe and hold an HTTP connection pool, so one client is
+    shared across OntologyChat instances (e.g. all Streamlit sessions) instead
+    of each session opening its own connections. Chat history stays per
+    instance.
+    """
+    try:
+        import openai
+    except ImportError:
+        raise ImportError(
+            "openai package not installed. Run: pip install openai"
+        )
+
+    if base_url:
+        # Local model (Ollama) or custom endpoint
+        return openai.OpenAI(
+            base_url=base_url,
+            api_key=api_key or "not-needed",
+            timeout=60,
+        )
+    # Standard OpenAI
+    return openai.OpenAI(api_key=api_key)
+
+
+# Limits that keep the ontology context within the model's prompt budget
+CONTEXT_MAX_PROPERTIES = 5
+CONTEXT_MAX_RULES = 20
+CONTEXT_MAX_FORMULA_CHARS = 100
+
+
+def _iter_context_lines(ontology: Ontology) -> Iterator[str]:
+    """Yield the lines of the ontology context used in the system prompt."""
+    # Basic info
+    yield f"ОНТОЛОГИЯ: {ontology.name} v{ontology.version}"
+    yield f"Источник: {ontology.source}"
+    yield ""
+
+    # Entities
+    yield f"ENTITIES ({len(ontology.entities)}):"
+    for entity in ontology.entities:
+        props = entity.properties
+        props_str = ", ".join([p.name for p in props[:CONTEXT_MAX_PROPERTIES]])
+        if len(props) > CONTEXT_MAX_PROPERTIES:
+            props_str += f"... (+{len(props) - CONTEXT_MAX_PROPERTIES})"
+        yield f"  - {entity.name} ({entity.entity_type}): {props_str}"
+        if entity.description:
+            yield f"    Описание: {entity.description}"
+    yield ""
+
+    # Relationships
+    yield f"RELATIONSHIPS ({len(ontology.relationships)}):"
+    for rel in ontology.relationships:
+        yield (
+            f"  - {rel.from_entity}.{rel.from_property} → "
+            f"{rel.to_entity}.{rel.to_property} ({rel.relationship_type}, {rel.cardinality})"
+        )
+    yield ""
+
+    # Business Rules (DAX measures)
+    rules = ontology.business_rules
+    if rules:
+        yield f"BUSINESS RULES / DAX MEASURES ({len(rules)}):"
+        for rule in islice(rules, CONTEXT_MAX_RULES):  # Limit to avoid context overflow
+            yield f"  - {rule.name} [{rule.classification}]"
+            cond = rule.condition
+            if cond:
+                # Truncate long DAX formulas
+                if len(cond) > CONTEXT_MAX_FORMULA_CHARS:
+                    cond = cond[:CONTEXT_MAX_FORMULA_CHARS] + "..."
+                yield f"    Formula: {cond}"
+        if len(rules) > CONTEXT_MAX_RULES:
+            yield f"  ... и ещё {len(rules) - CONTEXT_MAX_RULES} правил"
+    yield ""
+
+    # Metadata
+    if ontology.metadata:
+        yield "METADATA:"
+        for key, value in islice(ontology.metadata.items(), 5):
+            yield f"  - {key}: {value}"
+
+
+# Output tokens per question, and the cap for a whole ask_many() batch: many
+# models reject requests for more than 4096 output tokens
+ANSWER_MAX_TOKENS = 1000
+BATCH_MAX_TOKENS = 4096
+
+# Prepended to the numbered questions of a batched ask_many() request
+BATCH_INSTRUCTION = (
+    "Ответь на каждый вопрос отдельно. Начинай каждый ответ с номера вопроса "
+    "в формате \"1)\", \"2)\" и т.д. на новой строке.\n\n"
+)
+
+_ANSWER_NUMBER_RE = re.compile(r"^[ \t]*(\d+)\)[ \t]*", re.MULTILINE)
+
+
+def _split_numbered_answers(reply: str, count: int) -> Optional[List[str]]:
+    """Split a "1) ... 2) ..." reply into count answers, or None if it does not match."""
+    markers = list(_ANSWER_NUMBER_RE.finditer(reply))
+    if [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
+        return None
+    ends = [m.start() for m in markers[1:]] + [len(reply)]
+    return [reply[m.end():end].strip() for m, end in zip(markers, ends)]
+
+
 class OntologyChat:
     """
     AI-powered chat for exploring Power BI ontologies.
@@ -56,13 +250,12 @@ class OntologyChat:
     entities, relationships, measures, and business rules.
     """
 
+    # Sent first and byte-identical in every request, so providers with
+    # automatic prefix caching can reuse it. The ontology context and the
+    # user role follow as separate system messages.
     SYSTEM_PROMPT = """Ты - эксперт по Power BI онтологиям и семантическим моделям данных.
 Твоя задача - отвечать на вопросы пользователя о загруженной онтологии.
-
-КОНТЕКСТ ОНТОЛОГИИ:
-{ontology_context}
-
-РОЛЬ ПОЛЬЗОВАТЕЛЯ: {user_role}
+Контекст онтологии и роль пользователя приведены в следующих сообщениях.
 
 ИНСТРУКЦИИ:
 1. Отвечай на русском языке, если вопрос на русском, иначе на английском
@@ -96,41 +289,67 @@ class OntologyChat:
             base_url: Custom API base URL (for Ollama or other providers)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        # Resolved once so every request names the same model; an empty
+        # OPENAI_MODEL falls back to the default instead of sending "".
+        self.model = model or os.getenv("OPENAI_MODEL") or "gpt-4o-mini"
         self.base_url = base_url or os.getenv("OLLAMA_BASE_URL")
+        logger.debug(f"Ontology chat using model {self.model}")
         self._client = None
-        self.session = ChatSession()
+        self.session = ChatSession(model=self.model)
+        self.history_token_budget: int = HISTORY_TOKEN_BUDGET
         self._last_request_time: float = 0.0
         self._min_request_interval: float = 1.0  # seconds between API calls
+        # (ontology, signature, context message) of the last ask()
+        self._context_cache: Optional[tuple] = None
+        # (key, suggestions) of the last get_suggestions()
+        self._suggestion_cache: Optional[tuple] = None
 
     def _get_client(self) -> Any:
-        """Lazy load OpenAI client."""
+        """Lazy load OpenAI client (shared by all chats with the same settings)."""
         if self._client is None:
-            try:
-                import openai
-
-                if self.base_url:
-                    # Local model (Ollama) or custom endpoint
-                    self._client = openai.OpenAI(
-                        base_url=self.base_url,
-                        api_key=self.api_key or "not-needed",
-                        timeout=60,
-                    )
-                else:
-                    # Standard OpenAI
-                    if not self.api_key:
-                        raise ValueError(
-                            "OPENAI_API_KEY not set. Please set it in .env file or environment."
-                        )
-                    self._client = openai.OpenAI(api_key=self.api_key)
-
-            except ImportError:
-                raise ImportError(
-                    "openai package not installed. Run: pip install openai"
+            if not self.base_url and not self.api_key:
+                raise ValueError(
+                    "OPENAI_API_KEY not set. Please set it in .env file or environment."
                 )
+            self._client = _get_openai_client(self.api_key, self.base_url)
 
         return self._client
 
+    def _system_messages(self, ontology: Ontology, user_role: str) -> List[Dict[str, str]]:
+        """
+        Get the system messages: instructions, ontology context, user role.
+
+        Ordered from most to least stable so that the longest possible prefix
+        stays identical between requests.
+
+        The context is rebuilt only when a different ontology object is passed
+        or its name, version or entity/relationship/rule counts change. Call
+        invalidate_context() after editing an ontology in place in other ways.
+        """
+        signature = (
+            ontology.name,
+            ontology.version,
+            len(ontology.entities),
+            len(ontology.relationships),
+            len(ontology.business_rules),
+        )
+        cached = self._context_cache
+        # Identity check (not id()) so a new ontology at a recycled address is not matched
+        if cached is None or cached[0] is not ontology or cached[1] != signature:
+            context = f"КОНТЕКСТ ОНТОЛОГИИ:\n{self.build_context(ontology)}"
+            cached = (ontology, signature, context)
+            self._context_cache = cached
+
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "system", "content": cached[2]},
+            {"role": "system", "content": f"РОЛЬ ПОЛЬЗОВАТЕЛЯ: {user_role}"},
+        ]
+
+    def invalidate_context(self) -> None:
+        """Force the ontology context to be rebuilt on the next ask()."""
+        self._context_cache = None
+
     def build_context(self, ontology: Ontology) -> str:
         """
         Build context string from ontology for the system prompt.
@@ -141,54 +360,7 @@ class OntologyChat:
         Returns:
             Formatted context string
         """
-        lines = []
-
-        # Basic info
-        lines.append(f"ОНТОЛОГИЯ: {ontology.name} v{ontology.version}")
-        lines.append(f"Источник: {ontology.source}")
-        lines.append("")
-
-        # Entities
-        lines.append(f"ENTITIES ({len(ontology.entities)}):")
-        for entity in ontology.entities:
-            props = [p.name for p in entity.properties]
-            props_str = ", ".join(props[:5])
-            if len(props) > 5:
-                props_str += f"... (+{len(props)-5})"
-            lines.append(f"  - {entity.name} ({entity.entity_type}): {props_str}")
-            if entity.description:
-                lines.append(f"    Описание: {entity.description}")
-        lines.append("")
-
-        # Relationships
-        lines.append(f"RELATIONSHIPS ({len(ontology.relationships)}):")
-        for rel in ontology.relationships:
-            lines.append(
-                f"  - {rel.from_entity}.{rel.from_property} → "
-                f"{rel.to_entity}.{rel.to_property} ({rel.relationship_type}, {rel.cardinality})"
-            )
-        lines.append("")
-
-        # Business Rules (DAX measures)
-        if ontology.business_rules:
-            lines.append(f"BUSINESS RULES / DAX MEASURES ({len(ontology.business_rules)}):")
-            for rule in ontology.business_rules[:20]:  # Limit to avoid context overflow
-                lines.append(f"  - {rule.name} [{rule.classification}]")
-                if rule.condition:
-                    # Truncate long DAX formulas
-                    cond = rule.condition[:100] + "..." if len(rule.condition) > 100 else rule.condition
-                    lines.append(f"    Formula: {cond}")
-            if len(ontology.business_rules) > 20:
-                lines.append(f"  ... и ещё {len(ontology.business_rules) - 20} правил")
-        lines.append("")
-
-        # Metadata
-        if ontology.metadata:
-            lines.append("METADATA:")
-            for key, value in list(ontology.metadata.items())[:5]:
-                lines.append(f"  - {key}: {value}")
-
-        return "\n".join(lines)
+        return "\n".join(_iter_context_lines(ontology))
 
     def ask(
         self,
@@ -210,45 +382,13 @@ class OntologyChat:
             AI-generated answer
         """
         client = self._get_client()
-
-        # Update session
-        self.session.ontology_name = ontology.name
-        self.session.user_role = user_role
-
-        # Build system prompt with context
-        context = self.build_context(ontology)
-        system_prompt = self.SYSTEM_PROMPT.format(
-            ontology_context=context,
-            user_role=user_role,
-        )
-
-        # Build messages
-        messages = [{"role": "system", "content": system_prompt}]
-
-        # Add history if requested
-        if include_history and self.session.messages:
-            messages.extend(self.session.get_history(limit=6))
+        messages = self._start_messages(ontology, user_role, include_history)
 
         # Add current question
         messages.append({"role": "user", "content": question})
 
         try:
-            # Rate limiting: enforce minimum interval between requests
-            now = time.monotonic()
-            elapsed = now - self._last_request_time
-            if elapsed < self._min_request_interval:
-                time.sleep(self._min_request_interval - elapsed)
-            self._last_request_time = time.monotonic()
-
-            # Call OpenAI API
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,  # Lower temperature for more factual answers
-                max_tokens=1000,
-            )
-
-            answer = response.choices[0].message.content or ""
+            answer = self._complete(client, messages, max_tokens=ANSWER_MAX_TOKENS)
 
             # Save to history
             self.session.add_message("user", question)
@@ -260,39 +400,152 @@ class OntologyChat:
             error_msg = f"Ошибка при обращении к API: {str(e)}"
             return error_msg
 
-    def get_suggestions(self, ontology: Ontology) -> List[str]:
+    def ask_many(
+        self,
+        questions: List[str],
+        ontology: Ontology,
+        user_role: str = "Analyst",
+        batch_size: int = 8,
+    ) -> List[str]:
+        """
+        Ask several questions, sending up to batch_size of them per API call.
+
+        The ontology context is sent once per batch instead of once per
+        question. If the batched request fails, or the model's reply cannot
+        be split into one numbered answer per question, the batch is
+        re-asked one question at a time.
+
+        Args:
+            questions: User's questions in natural language
+            ontology: The loaded ontology to query
+            user_role: User's role for permission context
+            batch_size: Maximum number of questions per API call
+
+        Returns:
+            One AI-generated answer per question, in order
+        """
+        answers: List[str] = []
+        for start in range(0, len(questions), batch_size):
+            batch = questions[start:start + batch_size]
+            if len(batch) == 1:
+                answers.append(self.ask(batch[0], ontology, user_role))
+                continue
+
+            client = self._get_client()
+            messages = self._start_messages(ontology, user_role, include_history=True)
+            numbered = "\n".join(f"{i}) {q}" for i, q in enumerate(batch, 1))
+            messages.append({"role": "user", "content": BATCH_INSTRUCTION + numbered})
+
+            max_tokens = min(ANSWER_MAX_TOKENS * len(batch), BATCH_MAX_TOKENS)
+            try:
+                reply = self._complete(client, messages, max_tokens=max_tokens)
+            except Exception as e:
+                logger.debug(f"Batched request failed ({e}); asking one by one")
+                parts = None
+            else:
+                parts = _split_numbered_answers(reply, len(batch))
+                if parts is None:
+                    logger.debug("Batched reply had no usable numbering; asking one by one")
+
+            if parts is None:
+                answers.extend(self.ask(q, ontology, user_role) for q in batch)
+                continue
+
+            for question, answer in zip(batch, parts):
+                self.session.add_message("user", question)
+                self.session.add_message("assistant", answer)
+            answers.extend(parts)
+
+        return answers
+
+    def _start_messages(
+        self,
+        ontology: Ontology,
+        user_role: str,
+        include_history: bool,
+    ) -> List[Dict[str, str]]:
+        """Build the system prompt and optional history for a new request."""
+        # Update session
+        self.session.ontology_name = ontology.name
+        self.session.user_role = user_role
+
+        # Build system prompt with context (cached between turns)
+        messages = self._system_messages(ontology, user_role)
+
+        # Add history if requested
+        if include_history and self.session.messages:
+            messages.extend(self.session.get_history(
+                limit=6,
+                max_tokens=self.history_token_budget,
+            ))
+
+        return messages
+
+    def _complete(self, client: Any, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """Send a rate-limited chat completion request and return the reply text."""
+        # Rate limiting: enforce minimum interval between requests
+        now = time.monotonic()
+        elapsed = now - self._last_request_time
+        if elapsed < self._min_request_interval:
+            time.sleep(self._min_request_interval - elapsed)
+        self._last_request_time = time.monotonic()
+
+        # Call OpenAI API
+        response = client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.3,  # Lower temperature for more factual answers
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content or ""
+
+    def get_suggestions(self, ontology: Ontology, max_n: int = 6) -> List[str]:
         """
         Get suggested questions based on ontology content.
 
         Args:
             ontology: The loaded ontology
+            max_n: Maximum number of suggestions
 
         Returns:
             List of suggested questions
         """
+        # The suggestions depend only on the first two entity names and on
+        # whether there are rules, so UI reruns reuse the last list.
+        key = (
+            tuple(e.name for e in ontology.entities[:2]),
+            bool(ontology.business_rules),
+        )
+        if self._suggestion_cache is None or self._suggestion_cache[0] != key:
+            self._suggestion_cache = (key, self._build_suggestions(*key))
+        return self._suggestion_cache[1][:max_n]
+
+    @staticmethod
+    def _build_suggestions(entity_names: tuple, has_rules: bool) -> List[str]:
+        """Build the suggested questions for the given entities and rules."""
         suggestions = [
             "Какие entities есть в онтологии?",
             "Покажи все relationships между entities",
         ]
 
         # Add entity-specific suggestions
-        if ontology.entities:
-            first_entity = ontology.entities[0].name
+        if entity_names:
+            first_entity = entity_names[0]
             suggestions.append(f"Расскажи подробнее о {first_entity}")
 
-            if len(ontology.entities) > 1:
-                second_entity = ontology.entities[1].name
+            if len(entity_names) > 1:
+                second_entity = entity_names[1]
                 suggestions.append(f"Как связаны {first_entity} и {second_entity}?")
 
         # Add measure-specific suggestions
-        if ontology.business_rules:
+        if has_rules:
             suggestions.append("Какие DAX меры определены?")
             suggestions.append("Покажи формулы для расчёта продаж")
 
         # Add permission suggestions
         suggestions.append("Какие права доступа есть у роли Analyst?")
 
-        return suggestions[:6]  # Limit to 6 suggestions
+        return suggestions
 
     def clear_history(self) -> None:
         """Clear chat history."""
@@ -15,9 +15,11 @@ Usage:
     pbix2owl diff --source v1.json --target v2.json
 """
 
-import json
+import hashlib
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 
@@ -27,15 +29,28 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskPr
 from rich.table import Table
 from rich.panel import Panel
 
+from powerbi_ontology import __version__
 from powerbi_ontology.extractor import PowerBIExtractor
-from powerbi_ontology.ontology_generator import OntologyGenerator, Ontology
+from powerbi_ontology.ontology_generator import (
+    BusinessRule,
+    Constraint,
+    Ontology,
+    OntologyEntity,
+    OntologyGenerator,
+    OntologyProperty,
+    OntologyRelationship,
+)
 from powerbi_ontology.export.owl import OWLExporter
 from powerbi_ontology.semantic_debt import SemanticDebtAnalyzer
 from powerbi_ontology.ontology_diff import OntologyDiff
+from powerbi_ontology.utils import json_io
 
 console = Console()
 logger = logging.getLogger(__name__)
 
+# batch --cache keeps outputs for this many of the most recently used files
+CACHE_MAX_ENTRIES = 256
+
 
 def setup_logging(verbose: bool):
     """Configure logging based on verbosity."""
@@ -85,8 +100,7 @@ def extract(input_path: str, output_path: str, output_format: str, include_rules
                 owl_exporter.save(str(output_file))
             else:
                 # JSON export
-                with open(output_file, "w") as f:
-                    json.dump(_ontology_to_dict(ontology), f, indent=2)
+                _write_ontology_json(ontology, output_file)
 
             console.print(f"[green]✓[/green] Exported to {output_file}")
 
@@ -102,20 +116,32 @@ def extract(input_path: str, output_path: str, output_format: str, include_rules
 @click.option("-i", "--input", "input_dir", required=True, type=click.Path(exists=True), help="Input directory with .pbix files")
 @click.option("-o", "--output", "output_dir", required=True, type=click.Path(), help="Output directory for ontologies")
 @click.option("-f", "--format", "output_format", type=click.Choice(["owl", "json"]), default="owl", help="Output format")
-@click.option("-w", "--workers", default=4, help="Number of parallel workers")
+@click.option("-w", "--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes (default: CPU count)")
 @click.option("--pattern", default="*.pbix", help="File pattern to match")
 @click.option("--recursive/--no-recursive", default=False, help="Search recursively")
-def batch(input_dir: str, output_dir: str, output_format: str, workers: int, pattern: str, recursive: bool):
+@click.option(
+    "--cache/--no-cache", "use_cache", default=False,
+    help=f"Reuse outputs of unchanged .pbix files (kept for the last {CACHE_MAX_ENTRIES} files in the user's app dir)",
+)
+def batch(
+    input_dir: str,
+    output_dir: str,
+    output_format: str,
+    workers: Optional[int],
+    pattern: str,
+    recursive: bool,
+    use_cache: bool,
+):
     """Batch process multiple .pbix files."""
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
+    cache_dir = Path(click.get_app_dir("pbix2owl")) / "cache" if use_cache else None
 
-    # Find files
-    if recursive:
-        files = list(input_path.rglob(pattern))
-    else:
-        files = list(input_path.glob(pattern))
+    # Find files, largest first: big files start early and small ones fill
+    # in idle workers at the end instead of one big file finishing last.
+    matches = input_path.rglob(pattern) if recursive else input_path.glob(pattern)
+    files = sorted(matches, key=lambda f: f.stat().st_size, reverse=True)
 
     if not files:
         console.print(f"[yellow]No files matching '{pattern}' found in {input_dir}[/yellow]")
@@ -123,38 +149,44 @@ def batch(input_dir: str, output_dir: str, output_format: str, workers: int, pat
 
     console.print(f"[bold]Found {len(files)} files to process[/bold]\n")
 
-    results = {"success": [], "failed": []}
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=console,
-    ) as progress:
-        task = progress.add_task("[cyan]Processing files...", total=len(files))
-
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {
-                executor.submit(_process_single_file, f, output_path, output_format): f
-                for f in files
-            }
+    # Rows are added as files finish, so per-file result dicts are not kept
+    success_table, failed_table = _new_batch_tables()
+
+    # Extraction is CPU-bound Python, so files are processed in separate
+    # processes rather than threads that would contend for the GIL. Jobs are
+    # submitted (and workers started) before the progress bar starts its
+    # refresh thread, so workers are never forked from a threaded process.
+    max_workers = min(len(files), workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_process_single_file, f, output_path, output_format, cache_dir): f
+            for f in files
+        }
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task("[cyan]Processing files...", total=len(files))
 
             for future in as_completed(futures):
                 file = futures[future]
                 try:
                     result = future.result()
-                    if result["success"]:
-                        results["success"].append(result)
-                    else:
-                        results["failed"].append(result)
                 except Exception as e:
-                    results["failed"].append({"file": str(file), "error": str(e)})
+                    result = {"success": False, "file": str(file), "error": str(e)}
+                _add_batch_result(success_table, failed_table, result)
 
                 progress.advance(task)
 
+    if cache_dir is not None:
+        _prune_cache(cache_dir, CACHE_MAX_ENTRIES)
+
     # Show results
-    _show_batch_results(results)
+    _show_batch_results(success_table, failed_table)
 
 
 @cli.command()
@@ -175,15 +207,18 @@ def analyze(input_dir: str, output_path: Optional[str], output_format: str, patt
 
     analyzer = SemanticDebtAnalyzer()
 
-    with console.status("[bold green]Loading ontologies..."):
-        for file in files:
-            try:
-                with open(file) as f:
-                    data = json.load(f)
-                ontology = _dict_to_ontology(data)
-                analyzer.add_ontology(file.name, ontology)
-            except Exception as e:
-                console.print(f"[yellow]Warning: Could not load {file.name}: {e}[/yellow]")
+    # Parse files in parallel; submit before the status spinner starts its
+    # thread (see batch), and add results in file order.
+    max_workers = min(len(files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_load_ontology_file, file) for file in files]
+
+        with console.status("[bold green]Loading ontologies..."):
+            for file, future in zip(files, futures):
+                try:
+                    analyzer.add_ontology(file.name, future.result())
+                except Exception as e:
+                    console.print(f"[yellow]Warning: Could not load {file.name}: {e}[/yellow]")
 
     report = analyzer.analyze()
 
@@ -191,10 +226,10 @@ def analyze(input_dir: str, output_path: Optional[str], output_format: str, patt
     if output_format == "markdown":
         content = report.to_markdown()
     else:
-        content = json.dumps(report.to_dict(), indent=2)
+        content = json_io.dumps(report.to_dict(), indent=True).decode()
 
     if output_path:
-        Path(output_path).write_text(content)
+        Path(output_path).write_text(content, encoding="utf-8")
         console.print(f"[green]✓[/green] Report saved to {output_path}")
     else:
         console.print(content)
@@ -215,13 +250,8 @@ def diff(source: str, target: str, output_path: Optional[str], output_format: st
 
     with console.status("[bold green]Comparing ontologies..."):
         # Load ontologies
-        with open(source_path) as f:
-            source_data = json.load(f)
-        with open(target_path) as f:
-            target_data = json.load(f)
-
-        source_ont = _dict_to_ontology(source_data)
-        target_ont = _dict_to_ontology(target_data)
+        source_ont = _load_ontology_file(source_path)
+        target_ont = _load_ontology_file(target_path)
 
         # Perform diff
         differ = OntologyDiff(source_ont, target_ont)
@@ -233,10 +263,10 @@ def diff(source: str, target: str, output_path: Optional[str], output_format: st
     elif output_format == "unified":
         content = report.to_unified_diff()
     else:
-        content = json.dumps(report.to_dict(), indent=2)
+        content = json_io.dumps(report.to_dict(), indent=True).decode()
 
     if output_path:
-        Path(output_path).write_text(content)
+        Path(output_path).write_text(content, encoding="utf-8")
         console.print(f"[green]✓[/green] Diff saved to {output_path}")
     else:
         console.print(content)
@@ -245,32 +275,54 @@ def diff(source: str, target: str, output_path: Optional[str], output_format: st
     _show_diff_summary(report)
 
 
-def _process_single_file(file: Path, output_dir: Path, output_format: str) -> dict:
-    """Process a single .pbix file."""
+def _process_single_file(
+    file: Path,
+    output_dir: Path,
+    output_format: str,
+    cache_dir: Optional[Path] = None,
+) -> dict:
+    """
+    Process a single .pbix file (module-level so it can run in a worker process).
+
+    With a cache_dir, outputs are stored under a hash of the file's content
+    and path and copied back when the same file is processed again.
+    """
     try:
+        # Determine output filename
+        suffix = ".owl" if output_format == "owl" else ".json"
+        output_file = output_dir / (file.stem + suffix)
+
+        cache_key = None
+        if cache_dir is not None:
+            cache_key = _cache_key(file, output_format)
+            stats = _restore_cached_output(cache_dir, cache_key, suffix, output_file)
+            if stats is not None:
+                return {"success": True, "file": str(file), "output": str(output_file), "cached": True, **stats}
+
         extractor = PowerBIExtractor(str(file))
         semantic_model = extractor.extract()
 
         generator = OntologyGenerator(semantic_model)
         ontology = generator.generate()
 
-        # Determine output filename
-        output_name = file.stem + (".owl" if output_format == "owl" else ".json")
-        output_file = output_dir / output_name
-
         if output_format == "owl":
             owl_exporter = OWLExporter(ontology)
             owl_exporter.save(str(output_file))
         else:
-            with open(output_file, "w") as f:
-                json.dump(_ontology_to_dict(ontology), f, indent=2)
+            _write_ontology_json(ontology, output_file)
+
+        stats = {
+            "entities": len(ontology.entities),
+            "relationships": len(ontology.relationships),
+        }
+        if cache_key is not None:
+            _store_cached_output(cache_dir, cache_key, suffix, output_file, stats)
 
         return {
             "success": True,
             "file": str(file),
             "output": str(output_file),
-            "entities": len(ontology.entities),
-            "relationships": len(ontology.relationships),
+            **stats,
         }
 
     except Exception as e:
@@ -281,6 +333,78 @@ def _process_single_file(file: Path, output_dir: Path, output_format: str) -> di
         }
 
 
+def _file_digest(path: Path) -> str:
+    """BLAKE2b digest of a file, read in chunks so large .pbix files are not loaded whole."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(file: Path, output_format: str) -> str:
+    """
+    Cache key for the output of a .pbix file.
+
+    Outputs embed the input path (the ontology source), so the key covers the
+    resolved path as well as the content, package version and format.
+    """
+    path_digest = hashlib.blake2b(str(file.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    return f"{_file_digest(file)}-{path_digest}-{__version__}-{output_format}"
+
+
+def _restore_cached_output(cache_dir: Path, cache_key: str, suffix: str, output_file: Path) -> Optional[dict]:
+    """Copy a cached output to output_file and return its stats, or None on a cache miss."""
+    stats_path = cache_dir / f"{cache_key}.stats.json"
+    try:
+        stats = json_io.load_path(stats_path)
+        shutil.copyfile(cache_dir / f"{cache_key}{suffix}", output_file)
+        # Mark the entry as recently used for _prune_cache()
+        os.utime(stats_path)
+    except (OSError, ValueError):
+        return None
+    return stats
+
+
+def _store_cached_output(cache_dir: Path, cache_key: str, suffix: str, output_file: Path, stats: dict):
+    """Store output_file and its stats in the cache; failures only disable caching."""
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write under temporary names and rename, so concurrent workers never
+        # see a partial entry. The stats file goes last and marks it complete.
+        output_path = cache_dir / f"{cache_key}{suffix}"
+        stats_path = cache_dir / f"{cache_key}.stats.json"
+        tmp = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+        shutil.copyfile(output_file, tmp)
+        os.replace(tmp, output_path)
+        tmp = stats_path.with_name(f"{stats_path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(json_io.dumps(stats))
+        os.replace(tmp, stats_path)
+    except OSError as e:
+        logger.warning(f"Could not cache output for {output_file.name}: {e}")
+
+
+def _prune_cache(cache_dir: Path, max_entries: int):
+    """Delete all but the max_entries most recently used cache entries."""
+    try:
+        entries = sorted(
+            cache_dir.glob("*.stats.json"), key=lambda p: p.stat().st_mtime, reverse=True
+        )
+        for stats_path in entries[max_entries:]:
+            cache_key = stats_path.name[:-len(".stats.json")]
+            # Stats first: without them the entry is already a cache miss
+            stats_path.unlink()
+            for suffix in (".owl", ".json"):
+                (cache_dir / f"{cache_key}{suffix}").unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not prune cache {cache_dir}: {e}")
+
+
+def _load_ontology_file(file: Path) -> Ontology:
+    """Load an ontology JSON file (module-level so it can run in a worker process)."""
+    return _dict_to_ontology(json_io.load_path(file))
+
+
 def _ontology_to_dict(ontology: Ontology) -> dict:
     """Convert Ontology to dictionary."""
     return {
@@ -338,44 +462,43 @@ def _ontology_to_dict(ontology: Ontology) -> dict:
     }
 
 
+def _write_ontology_json(ontology: Ontology, output_file: Path):
+    """Write an ontology as indented UTF-8 JSON."""
+    # json_io uses orjson when installed; either backend keeps Cyrillic names
+    # as UTF-8 instead of \uXXXX-escaping every character.
+    Path(output_file).write_bytes(json_io.dumps(_ontology_to_dict(ontology), indent=True))
+
+
 def _dict_to_ontology(data: dict) -> Ontology:
     """Convert dictionary to Ontology."""
-    from powerbi_ontology.ontology_generator import (
-        OntologyEntity,
-        OntologyProperty,
-        OntologyRelationship,
-        BusinessRule,
-        Constraint,
-    )
-
-    entities = []
-    for e_data in data.get("entities", []):
-        props = []
-        for p_data in e_data.get("properties", []):
-            constraints = [
-                Constraint(type=c["type"], value=c["value"], message=c.get("message", ""))
-                for c in p_data.get("constraints", [])
-            ]
-            props.append(OntologyProperty(
-                name=p_data["name"],
-                data_type=p_data.get("data_type", "String"),
-                required=p_data.get("required", False),
-                unique=p_data.get("unique", False),
-                description=p_data.get("description", ""),
-                constraints=constraints,
-            ))
-
-        entities.append(OntologyEntity(
+    # Built with comprehensions over the nested lists; the keyword defaults
+    # match the JSON written by _ontology_to_dict for older/partial files.
+    entities = [
+        OntologyEntity(
             name=e_data["name"],
             description=e_data.get("description", ""),
             entity_type=e_data.get("entity_type", "standard"),
-            properties=props,
+            properties=[
+                OntologyProperty(
+                    name=p_data["name"],
+                    data_type=p_data.get("data_type", "String"),
+                    required=p_data.get("required", False),
+                    unique=p_data.get("unique", False),
+                    description=p_data.get("description", ""),
+                    constraints=[
+                        Constraint(type=c["type"], value=c["value"], message=c.get("message", ""))
+                        for c in p_data.get("constraints", ())
+                    ],
+                )
+                for p_data in e_data.get("properties", ())
+            ],
             constraints=[],
-        ))
+        )
+        for e_data in data.get("entities", ())
+    ]
 
-    relationships = []
-    for r_data in data.get("relationships", []):
-        relationships.append(OntologyRelationship(
+    relationships = [
+        OntologyRelationship(
             from_entity=r_data["from_entity"],
             to_entity=r_data["to_entity"],
             from_property=r_data.get("from_property", ""),
@@ -383,11 +506,12 @@ def _dict_to_ontology(data: dict) -> Ontology:
             relationship_type=r_data.get("relationship_type", "related_to"),
             cardinality=r_data.get("cardinality", "one-to-many"),
             description=r_data.get("description", ""),
-        ))
+        )
+        for r_data in data.get("relationships", ())
+    ]
 
-    rules = []
-    for b_data in data.get("business_rules", []):
-        rules.append(BusinessRule(
+    rules = [
+        BusinessRule(
             name=b_data["name"],
             entity=b_data.get("entity", ""),
             condition=b_data.get("condition", ""),
@@ -395,7 +519,9 @@ def _dict_to_ontology(data: dict) -> Ontology:
             classification=b_data.get("classification", ""),
             description=b_data.get("description", ""),
             priority=b_data.get("priority", 1),
-        ))
+        )
+        for b_data in data.get("business_rules", ())
+    ]
 
     return Ontology(
         name=data.get("name", "Unnamed"),
@@ -426,52 +552,63 @@ def _show_extraction_summary(ontology: Ontology):
     console.print(table)
 
 
-def _show_batch_results(results: dict):
+def _new_batch_tables() -> tuple:
+    """Create the (success, failed) result tables for batch processing."""
+    success_table = Table()
+    success_table.add_column("File", style="cyan")
+    success_table.add_column("Entities", justify="right")
+    success_table.add_column("Relationships", justify="right")
+    success_table.add_column("Output")
+
+    failed_table = Table()
+    failed_table.add_column("File", style="cyan")
+    failed_table.add_column("Error", style="red")
+
+    return success_table, failed_table
+
+
+def _add_batch_result(success_table: Table, failed_table: Table, result: dict):
+    """Add a _process_single_file result to the matching batch table."""
+    if result["success"]:
+        success_table.add_row(
+            Path(result["file"]).name,
+            str(result.get("entities", 0)),
+            str(result.get("relationships", 0)),
+            Path(result["output"]).name + (" (cached)" if result.get("cached") else ""),
+        )
+    else:
+        failed_table.add_row(
+            Path(result["file"]).name,
+            result.get("error", "Unknown error")[:60],
+        )
+
+
+def _show_batch_results(success_table: Table, failed_table: Table):
     """Display batch processing results."""
+    succeeded = success_table.row_count
+    failed = failed_table.row_count
     console.print()
 
     # Success table
-    if results["success"]:
-        table = Table(title=f"[green]✓ Successfully Processed ({len(results['success'])} files)[/green]")
-        table.add_column("File", style="cyan")
-        table.add_column("Entities", justify="right")
-        table.add_column("Relationships", justify="right")
-        table.add_column("Output")
-
-        for r in results["success"]:
-            table.add_row(
-                Path(r["file"]).name,
-                str(r.get("entities", 0)),
-                str(r.get("relationships", 0)),
-                Path(r["output"]).name,
-            )
-
-        console.print(table)
+    if succeeded:
+        success_table.title = f"[green]✓ Successfully Processed ({succeeded} files)[/green]"
+        console.print(success_table)
 
     # Failure table
-    if results["failed"]:
+    if failed:
         console.print()
-        table = Table(title=f"[red]✗ Failed ({len(results['failed'])} files)[/red]")
-        table.add_column("File", style="cyan")
-        table.add_column("Error", style="red")
-
-        for r in results["failed"]:
-            table.add_row(
-                Path(r["file"]).name,
-                r.get("error", "Unknown error")[:60],
-            )
-
-        console.print(table)
+        failed_table.title = f"[red]✗ Failed ({failed} files)[/red]"
+        console.print(failed_table)
 
     # Summary panel
-    total = len(results["success"]) + len(results["failed"])
-    success_rate = len(results["success"]) / total * 100 if total > 0 else 0
+    total = succeeded + failed
+    success_rate = succeeded / total * 100 if total > 0 else 0
 
     console.print()
     console.print(Panel(
         f"[bold]Total:[/bold] {total} files\n"
-        f"[green]Success:[/green] {len(results['success'])}\n"
-        f"[red]Failed:[/red] {len(results['failed'])}\n"
+        f"[green]Success:[/green] {succeeded}\n"
+        f"[red]Failed:[/red] {failed}\n"
         f"[cyan]Success Rate:[/cyan] {success_rate:.1f}%",
         title="Batch Summary",
     ))
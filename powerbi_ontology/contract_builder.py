@@ -9,7 +9,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 from powerbi_ontology.ontology_generator import Ontology, BusinessRule, Constraint
-from powerbi_ontology.dax_parser import DAXParser
+from powerbi_ontology.dax_parser import parser as dax_parser
 from powerbi_ontology.extractor import SemanticModel, Measure
 
 logger = logging.getLogger(__name__)
@@ -65,7 +65,7 @@ class ContractBuilder:
             ontology: The ontology to build contracts from
         """
         self.ontology = ontology
-        self.dax_parser = DAXParser()
+        self.dax_parser = dax_parser
 
     def build_contract(
         self,
@@ -136,8 +136,10 @@ class ContractBuilder:
             entities_used.add(rel.to_entity)
         
         # Get entities from measures
-        for measure in semantic_model.measures:
-            parsed = self.dax_parser.parse_measure(measure.name, measure.dax_formula)
+        parsed_measures = self.dax_parser.parse_measures(
+            (measure.name, measure.dax_formula) for measure in semantic_model.measures
+        )
+        for parsed in parsed_measures:
             for dep in parsed.dependencies:
                 if '.' in dep:
                     entity = dep.split('.')[0]
@@ -6,18 +6,87 @@ Parses DAX formulas to extract business rules and semantic meaning.
 
 import logging
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Set
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Set, Tuple
 
-from pyparsing import (
-    CaselessKeyword, Word, alphanums, nums, oneOf, opAssoc, infixNotation,
-    ParseException, Suppress, Optional as Opt, Group
-)
+from powerbi_ontology.utils.compat import dataclass_options
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import; measures are parsed in bulk.
+# Patterns 1-3: opening of a CALCULATE(...), IF(...) or SWITCH(...) call; the
+# arguments are then split by DAXParser._split_args, which handles nesting
+_LOGIC_CALL_RE = re.compile(r'\b(CALCULATE|IF|SWITCH)\s*\(', re.IGNORECASE)
+# Characters that matter when splitting call arguments, and the closing
+# character of each skipped "string", 'Table name' or [Column name]
+_ARG_DELIMITER_RE = re.compile(r'[(),"\'\[]')
+_ARG_CLOSERS = {'"': '"', "'": "'", '[': ']'}
+# Pattern 4: field > value. The leading \b only lets a match start at the
+# beginning of a word; without it every position inside an identifier is
+# retried, each backtracking over the rest of the word.
+_THRESHOLD_RE = re.compile(r'\b(\w+)\s*(>|<|>=|<=|=)\s*(\d+\.?\d*)')
+# Fields compared in an extracted condition, e.g. RiskScore in "RiskScore > 80"
+_CONDITION_FIELD_RE = re.compile(r'\b(\w+)\s*[<>=]')
+# Table[Column] and Table[ references in one pattern; the column group is
+# empty when the brackets hold something other than a plain name
+_DEPENDENCY_RE = re.compile(r'(\w+)\[(?:(\w+)\])?')
+_ENTITY_RE = re.compile(r'(\w+)\[')
+_WS_RE = re.compile(r'\s+')
+# IF/SWITCH result value -> rule name and action suffix: drop quotes, spaces to _
+_ACTION_TRANS = str.maketrans({'"': None, ' ': '_'})
 
-@dataclass
+# Measure type classification: DAX function name -> category bit. Only whole
+# function names followed by "(" count, so IFERROR, column names such as
+# Sales[SUM_Amount] or words like DIFFERENCE no longer match by substring.
+_TIME_INTELLIGENCE = 1
+_CONDITIONAL = 2
+_CALCULATE = 4
+_FILTER_FUNCTION = 8
+_AGGREGATION = 16
+
+_CLASSIFY_KEYWORDS = {
+    **dict.fromkeys([
+        'DATEADD', 'TOTALYTD', 'TOTALQTD', 'TOTALMTD', 'SAMEPERIODLASTYEAR',
+        'DATESYTD', 'DATESQTD', 'DATESMTD', 'PARALLELPERIOD',
+        'PREVIOUSDAY', 'PREVIOUSMONTH', 'PREVIOUSQUARTER', 'PREVIOUSYEAR',
+    ], _TIME_INTELLIGENCE),
+    **dict.fromkeys(['IF', 'SWITCH'], _CONDITIONAL),
+    'CALCULATE': _CALCULATE,
+    **dict.fromkeys(['FILTER', 'KEEPFILTERS'], _FILTER_FUNCTION),
+    **dict.fromkeys([
+        'SUM', 'SUMX', 'COUNT', 'COUNTA', 'COUNTAX', 'COUNTX', 'COUNTROWS', 'COUNTBLANK',
+        'DISTINCTCOUNT', 'AVG', 'AVERAGE', 'AVERAGEX', 'MAX', 'MAXX', 'MIN', 'MINX',
+    ], _AGGREGATION),
+}
+# Any function call; the name is looked up in _CLASSIFY_KEYWORDS
+_FUNCTION_CALL_RE = re.compile(r'(\w+)\s*\(')
+
+# Upper-cased DAX function and keyword names, never reported as tables by
+# identify_dependencies()
+_DAX_FUNCS = frozenset(_CLASSIFY_KEYWORDS) | frozenset({
+    'ADDCOLUMNS', 'ALL', 'ALLEXCEPT', 'ALLSELECTED', 'AND', 'BLANK', 'CALCULATETABLE',
+    'CROSSFILTER', 'DATE', 'DAY', 'DISTINCT', 'DIVIDE', 'EARLIER', 'FALSE', 'FORMAT',
+    'HASONEVALUE', 'IFERROR', 'ISBLANK', 'LOOKUPVALUE', 'MONTH', 'NOT', 'NOW', 'OR',
+    'RANKX', 'RELATED', 'RELATEDTABLE', 'REMOVEFILTERS', 'RETURN', 'SELECTEDVALUE',
+    'SUMMARIZE', 'TODAY', 'TOPN', 'TRUE', 'USERELATIONSHIP', 'VALUES', 'VAR', 'YEAR',
+})
+
+# Parsed measures are cached per (measure name, formula): models often repeat
+# the same formula across tables, and re-ingesting a model parses it again.
+PARSE_CACHE_SIZE = 4096
+
+# parse_measures(): batches at least this large may be split into chunks of
+# PARALLEL_PARSE_CHUNK_SIZE measures and parsed in worker processes
+PARALLEL_PARSE_THRESHOLD = 2000
+PARALLEL_PARSE_CHUNK_SIZE = 200
+
+# Parse results are shared between cache hits, so they must be immutable
+_RESULT_DATACLASS_OPTIONS = dataclass_options(frozen=True)
+
+
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class BusinessRule:
     """Represents a business rule extracted from DAX."""
     name: str
@@ -29,13 +98,13 @@ class BusinessRule:
     classification: str = ""
 
 
-@dataclass
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class ParsedRule:
     """Parsed DAX measure with extracted information."""
     measure_name: str
     dax_formula: str
-    business_rules: List[BusinessRule]
-    dependencies: List[str]
+    business_rules: Tuple[BusinessRule, ...]
+    dependencies: FrozenSet[str]
     measure_type: str  # AGGREGATION, CALCULATION, CONDITIONAL, FILTER, TIME_INTELLIGENCE
 
 
@@ -47,43 +116,20 @@ class DAXParser:
     as formal business rules. For example:
     - HighRiskCustomers = CALCULATE(COUNT(...), RiskScore > 80)
     - This becomes: BusinessRule(condition="RiskScore > 80", classification="HighRisk")
+    
+    The parser holds no state: all methods are static, so instances are
+    interchangeable and the module-level ``parser`` can be shared.
     """
 
-    def __init__(self):
-        """Initialize DAX parser."""
-        self._setup_parser()
-
-    def _setup_parser(self):
-        """Setup pyparsing grammar for DAX."""
-        # Basic tokens
-        identifier = Word(alphanums + "_")
-        number = Word(nums + ".-")
-        
-        # DAX functions
-        calculate = CaselessKeyword("CALCULATE")
-        sum_func = CaselessKeyword("SUM")
-        count_func = CaselessKeyword("COUNT")
-        distinctcount = CaselessKeyword("DISTINCTCOUNT")
-        if_func = CaselessKeyword("IF")
-        switch_func = CaselessKeyword("SWITCH")
-        
-        # Operators
-        gt = ">"
-        lt = "<"
-        eq = "="
-        ge = ">="
-        le = "<="
-        and_op = CaselessKeyword("AND")
-        or_op = CaselessKeyword("OR")
-        
-        # Store for later use
-        self.identifier = identifier
-        self.number = number
-
-    def parse_measure(self, measure_name: str, dax_formula: str) -> ParsedRule:
+    @staticmethod
+    @lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def parse_measure(measure_name: str, dax_formula: str) -> ParsedRule:
         """
         Parse a DAX measure to extract business rules.
         
+        Results are cached per measure name and formula; use
+        ``DAXParser.parse_measure.cache_clear()`` to reset the cache.
+        
         Args:
             measure_name: Name of the measure
             dax_formula: DAX formula string
@@ -93,35 +139,67 @@ class DAXParser:
         """
         logger.debug(f"Parsing measure: {measure_name}")
         
-        business_rules = []
-        dependencies = self.identify_dependencies(dax_formula)
-        measure_type = self.classify_measure_type(dax_formula)
+        dependencies = DAXParser.identify_dependencies(dax_formula)
+        measure_type = DAXParser.classify_measure_type(dax_formula)
         
         # Extract business logic
-        extracted_rules = self.extract_business_logic(measure_name, dax_formula)
-        business_rules.extend(extracted_rules)
+        business_rules = DAXParser.extract_business_logic(measure_name, dax_formula)
         
         return ParsedRule(
             measure_name=measure_name,
             dax_formula=dax_formula,
-            business_rules=business_rules,
+            business_rules=tuple(business_rules),
             dependencies=dependencies,
             measure_type=measure_type
         )
 
-    def extract_business_logic(self, measure_name: str, dax_formula: str) -> List[BusinessRule]:
+    @staticmethod
+    def parse_measures(
+        measures: Iterable[Tuple[str, str]],
+        max_workers: Optional[int] = None,
+    ) -> List[ParsedRule]:
+        """
+        Parse many DAX measures.
+        
+        Repeated (name, formula) pairs are parsed once. Measures are parsed in
+        this process unless max_workers > 1 and there are at least
+        PARALLEL_PARSE_THRESHOLD of them; then chunks are parsed in a pool of
+        max_workers processes.
+        
+        Args:
+            measures: (measure name, DAX formula) pairs
+            max_workers: Worker processes for large batches (default: none)
+            
+        Returns:
+            ParsedRule for each measure, in input order
+        """
+        items = list(measures)
+        if max_workers and max_workers > 1 and len(items) >= PARALLEL_PARSE_THRESHOLD:
+            unique = list(dict.fromkeys(items))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parsed = dict(zip(unique, executor.map(
+                    _parse_measure_item, unique, chunksize=PARALLEL_PARSE_CHUNK_SIZE
+                )))
+            return [parsed[item] for item in items]
+        
+        parse = DAXParser.parse_measure
+        return [parse(name, formula) for name, formula in items]
+
+    @staticmethod
+    def extract_business_logic(measure_name: str, dax_formula: str) -> List[BusinessRule]:
         """
-        Extract business logic from a DAX formula using regex-based subset parsing.
+        Extract business logic from a DAX formula using subset parsing.
 
-        This is a **subset parser** — it recognises 4 DAX patterns via regex,
-        not the full DAX grammar:
+        This is a **subset parser** — it recognises 4 DAX patterns, not the
+        full DAX grammar. Call arguments are split with nesting taken into
+        account, so nested calls (including nested CALCULATE) are found:
 
-          1. CALCULATE(expr, filter)  — single-level only
-          2. IF(condition, true, false)
+          1. CALCULATE(expr, filter, …)
+          2. IF(condition, true[, false])
           3. SWITCH(TRUE(), condition, value, …)
           4. Simple thresholds  (field > value)
 
-        **Not supported**: nested CALCULATE (inner level), VAR/RETURN blocks,
+        **Not supported**: VAR/RETURN blocks,
         row-context iterators (SUMX, FILTER), table constructors,
         SELECTEDVALUE, HASONEVALUE, time-intelligence functions (SAMEPERIODLASTYEAR, etc.).
 
@@ -132,76 +210,82 @@ class DAXParser:
         Returns:
             List of BusinessRule objects extracted from recognised patterns
         """
-        rules = []
-        dax_upper = dax_formula.upper()
+        # Rules are kept per pattern so they come out in pattern order
+        calculate_rules = []
+        if_rules = []
+        switch_rules = []
         
-        # Pattern 1: CALCULATE with filter conditions
-        # Example: CALCULATE(COUNT(...), RiskScore > 80)
-        calculate_pattern = r'CALCULATE\s*\([^,]+,\s*([^)]+)\)'
-        calculate_matches = re.finditer(calculate_pattern, dax_formula, re.IGNORECASE)
-        
-        for match in calculate_matches:
-            filter_condition = match.group(1).strip()
-            # Extract condition parts
-            condition = self._parse_condition(filter_condition)
-            if condition:
-                rule = BusinessRule(
-                    name=f"{measure_name}_Filter",
-                    condition=condition,
-                    action="filter",
-                    description=f"Filter condition from {measure_name}: {condition}",
-                    entity=self._extract_entity_from_condition(condition)
-                )
-                rules.append(rule)
-        
-        # Pattern 2: IF conditions
-        # Example: IF(RiskScore > 80, "High", "Low")
-        if_pattern = r'IF\s*\(\s*([^,]+),\s*([^,]+),\s*([^)]+)\)'
-        if_matches = re.finditer(if_pattern, dax_formula, re.IGNORECASE)
-        
-        for match in if_matches:
-            condition = match.group(1).strip()
-            true_value = match.group(2).strip()
-            false_value = match.group(3).strip()
+        for match in _LOGIC_CALL_RE.finditer(dax_formula):
+            function = match.group(1).upper()
+            args, end = DAXParser._split_args(dax_formula, match.end())
+            if end < 0:
+                # Call is never closed (malformed DAX)
+                continue
             
-            parsed_condition = self._parse_condition(condition)
-            if parsed_condition:
-                rule = BusinessRule(
-                    name=f"{measure_name}_Condition",
-                    condition=parsed_condition,
-                    action=f"classify_as_{true_value.replace('\"', '').replace(' ', '_').lower()}",
-                    classification=true_value.replace('"', '').strip(),
-                    description=f"IF condition: {parsed_condition} then {true_value} else {false_value}",
-                    entity=self._extract_entity_from_condition(condition)
-                )
-                rules.append(rule)
-        
-        # Pattern 3: SWITCH statements
-        # Example: SWITCH(TRUE(), RiskScore > 80, "High", RiskScore > 50, "Medium", "Low")
-        switch_pattern = r'SWITCH\s*\([^,]+,\s*([^)]+)\)'
-        switch_matches = re.finditer(switch_pattern, dax_formula, re.IGNORECASE)
-        
-        for match in switch_matches:
-            switch_body = match.group(1)
-            # Parse switch cases
-            cases = self._parse_switch_cases(switch_body)
-            for case_condition, case_value in cases:
-                parsed_condition = self._parse_condition(case_condition)
+            # Pattern 1: CALCULATE with filter conditions
+            # Example: CALCULATE(COUNT(...), RiskScore > 80)
+            if function == 'CALCULATE':
+                if len(args) < 2:
+                    continue
+                # Extract condition parts
+                condition = DAXParser._parse_condition(', '.join(args[1:]))
+                if condition:
+                    calculate_rules.append(BusinessRule(
+                        name=f"{measure_name}_Filter",
+                        condition=condition,
+                        action="filter",
+                        description=f"Filter condition from {measure_name}: {condition}",
+                        entity=DAXParser._extract_entity_from_condition(condition)
+                    ))
+            
+            # Pattern 2: IF conditions
+            # Example: IF(RiskScore > 80, "High", "Low")
+            elif function == 'IF':
+                if len(args) < 2:
+                    continue
+                condition = args[0]
+                true_value = args[1]
+                # IF without a false branch returns BLANK()
+                false_value = args[2] if len(args) > 2 else "BLANK()"
+                
+                parsed_condition = DAXParser._parse_condition(condition)
                 if parsed_condition:
-                    rule = BusinessRule(
-                        name=f"{measure_name}_Switch_{case_value.replace('\"', '').replace(' ', '_')}",
+                    slug = true_value.translate(_ACTION_TRANS)
+                    if_rules.append(BusinessRule(
+                        name=f"{measure_name}_Condition",
                         condition=parsed_condition,
-                        action=f"classify_as_{case_value.replace('\"', '').replace(' ', '_').lower()}",
-                        classification=case_value.replace('"', '').strip(),
-                        description=f"SWITCH case: {parsed_condition} -> {case_value}",
-                        entity=self._extract_entity_from_condition(case_condition)
-                    )
-                    rules.append(rule)
+                        action=f"classify_as_{slug.lower()}",
+                        classification=true_value.replace('"', '').strip(),
+                        description=f"IF condition: {parsed_condition} then {true_value} else {false_value}",
+                        entity=DAXParser._extract_entity_from_condition(condition)
+                    ))
+            
+            # Pattern 3: SWITCH statements
+            # Example: SWITCH(TRUE(), RiskScore > 80, "High", RiskScore > 50, "Medium", "Low")
+            else:
+                # Parse switch cases (arguments after the switched expression)
+                for case_condition, case_value in DAXParser._pair_switch_cases(args[1:]):
+                    parsed_condition = DAXParser._parse_condition(case_condition)
+                    if parsed_condition:
+                        slug = case_value.translate(_ACTION_TRANS)
+                        switch_rules.append(BusinessRule(
+                            name=f"{measure_name}_Switch_{slug}",
+                            condition=parsed_condition,
+                            action=f"classify_as_{slug.lower()}",
+                            classification=case_value.replace('"', '').strip(),
+                            description=f"SWITCH case: {parsed_condition} -> {case_value}",
+                            entity=DAXParser._extract_entity_from_condition(case_condition)
+                        ))
+        
+        rules = calculate_rules + if_rules + switch_rules
+        # Fields already compared in an extracted rule (see Pattern 4)
+        captured_fields = set()
+        for rule in rules:
+            captured_fields.update(_CONDITION_FIELD_RE.findall(rule.condition))
         
         # Pattern 4: Simple threshold conditions
         # Example: RiskScore > 80
-        threshold_pattern = r'(\w+)\s*(>|<|>=|<=|=)\s*(\d+\.?\d*)'
-        threshold_matches = re.finditer(threshold_pattern, dax_formula)
+        threshold_matches = _THRESHOLD_RE.finditer(dax_formula)
         
         for match in threshold_matches:
             field = match.group(1)
@@ -209,49 +293,95 @@ class DAXParser:
             value = match.group(3)
             
             # Only add if not already captured by other patterns
-            if not any(field in r.condition for r in rules):
+            if field not in captured_fields:
+                captured_fields.add(field)
                 rule = BusinessRule(
                     name=f"{measure_name}_Threshold",
                     condition=f"{field} {operator} {value}",
                     action="threshold_check",
                     description=f"Threshold condition: {field} {operator} {value}",
-                    entity=self._extract_entity_from_field(field)
+                    entity=DAXParser._extract_entity_from_field(field)
                 )
                 rules.append(rule)
         
         return rules
 
-    def _parse_condition(self, condition: str) -> Optional[str]:
+    @staticmethod
+    def _parse_condition(condition: str) -> Optional[str]:
         """Parse a condition string and normalize it."""
         # Clean up the condition
         condition = condition.strip()
         # Remove extra whitespace
-        condition = re.sub(r'\s+', ' ', condition)
+        condition = _WS_RE.sub(' ', condition)
         return condition if condition else None
 
-    def _parse_switch_cases(self, switch_body: str) -> List[tuple]:
+    @staticmethod
+    def _split_args(text: str, start: int = 0) -> Tuple[List[str], int]:
+        """
+        Split the arguments of a call whose opening parenthesis ends at ``start``.
+        
+        Commas inside nested parentheses, [Column names] and quoted strings
+        or 'Table names' do not split. Scanning stops at the matching closing
+        parenthesis, or at the end of the text if there is none.
+        
+        Returns:
+            Tuple of (stripped arguments, index just after the closing
+            parenthesis, or -1 if the call is not closed)
+        """
+        args = []
+        depth = 0
+        arg_start = i = start
+        while True:
+            match = _ARG_DELIMITER_RE.search(text, i)
+            if match is None:
+                break
+            i = match.start()
+            char = text[i]
+            if char in _ARG_CLOSERS:
+                # Skip strings and names; column names may contain commas
+                # and parentheses
+                close = text.find(_ARG_CLOSERS[char], i + 1)
+                if close == -1:
+                    break
+                i = close
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                if depth == 0:
+                    args.append(text[arg_start:i].strip())
+                    return args, i + 1
+                depth -= 1
+            elif depth == 0:
+                args.append(text[arg_start:i].strip())
+                arg_start = i + 1
+            i += 1
+        # Unbalanced call: keep what was read
+        args.append(text[arg_start:].strip())
+        return args, -1
+
+    @staticmethod
+    def _parse_switch_cases(switch_body: str) -> List[tuple]:
         """Parse SWITCH cases from switch body."""
-        cases = []
-        # Simple parsing - split by comma and pair up
-        parts = [p.strip() for p in switch_body.split(',')]
         # SWITCH format: condition1, value1, condition2, value2, ..., default_value
-        i = 0
-        while i < len(parts) - 1:
-            condition = parts[i]
-            value = parts[i + 1]
-            cases.append((condition, value))
-            i += 2
-        return cases
-
-    def _extract_entity_from_condition(self, condition: str) -> str:
+        args, _ = DAXParser._split_args(switch_body)
+        return DAXParser._pair_switch_cases(args)
+
+    @staticmethod
+    def _pair_switch_cases(parts: List[str]) -> List[tuple]:
+        """Pair up SWITCH arguments as (condition, value); a trailing default is dropped."""
+        return [(parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2)]
+
+    @staticmethod
+    def _extract_entity_from_condition(condition: str) -> str:
         """Extract entity name from condition (e.g., 'Customer[RiskScore]' -> 'Customer')."""
         # Match table[column] pattern
-        match = re.search(r'(\w+)\[', condition)
+        match = _ENTITY_RE.search(condition)
         if match:
             return match.group(1)
         return ""
 
-    def _extract_entity_from_field(self, field: str) -> str:
+    @staticmethod
+    def _extract_entity_from_field(field: str) -> str:
         """Extract entity from field name (heuristic)."""
         # If field contains underscore, might be entity_field
         if '_' in field:
@@ -259,7 +389,8 @@ class DAXParser:
             return parts[0].capitalize()
         return ""
 
-    def identify_dependencies(self, dax_formula: str) -> List[str]:
+    @staticmethod
+    def identify_dependencies(dax_formula: str) -> FrozenSet[str]:
         """
         Identify table/column dependencies from DAX formula.
         
@@ -267,51 +398,60 @@ class DAXParser:
             dax_formula: DAX formula string
             
         Returns:
-            List of dependencies in format "Table.Column"
+            Set of dependencies in format "Table.Column" (unordered; sort
+            where a stable order is needed)
         """
         dependencies = set()
         
-        # Match table[column] patterns
-        pattern = r'(\w+)\[(\w+)\]'
-        matches = re.findall(pattern, dax_formula)
-        for table, column in matches:
-            dependencies.add(f"{table}.{column}")
-        
-        # Also match table references (without column)
-        table_pattern = r'\b([A-Z][a-zA-Z0-9_]*)\['
-        table_matches = re.findall(table_pattern, dax_formula)
-        for table in table_matches:
-            if table.upper() not in ['IF', 'CALCULATE', 'SUM', 'COUNT', 'AVG', 'MAX', 'MIN']:
+        for table, column in _DEPENDENCY_RE.findall(dax_formula):
+            if column:
+                dependencies.add(f"{table}.{column}")
+            # Table reference without a plain column name, e.g. Sales[Net Amount]
+            elif (table.isascii() and table[0].isupper()
+                  and table.upper() not in _DAX_FUNCS):
                 dependencies.add(f"{table}.*")
         
-        return sorted(list(dependencies))
+        return frozenset(dependencies)
 
-    def classify_measure_type(self, dax_formula: str) -> str:
+    @staticmethod
+    def classify_measure_type(dax_formula: str) -> str:
         """
         Classify the type of DAX measure.
         
         Returns:
             MeasureType: AGGREGATION, CALCULATION, CONDITIONAL, FILTER, TIME_INTELLIGENCE
         """
-        dax_upper = dax_formula.upper()
-        
+        # One pass over the formula collects every category that occurs
+        categories = 0
+        for name in _FUNCTION_CALL_RE.findall(dax_formula):
+            categories |= _CLASSIFY_KEYWORDS.get(name.upper(), 0)
+
         # Time intelligence functions
-        time_intel_keywords = ['DATEADD', 'TOTALYTD', 'TOTALQTD', 'TOTALMTD', 'SAMEPERIODLASTYEAR']
-        if any(keyword in dax_upper for keyword in time_intel_keywords):
+        if categories & _TIME_INTELLIGENCE:
             return "TIME_INTELLIGENCE"
-        
+
         # Conditional logic
-        if 'IF' in dax_upper or 'SWITCH' in dax_upper:
+        if categories & _CONDITIONAL:
             return "CONDITIONAL"
-        
+
         # Filter logic
-        if 'CALCULATE' in dax_upper and ('FILTER' in dax_upper or '>' in dax_formula or '<' in dax_formula):
+        if categories & _CALCULATE and (
+            categories & _FILTER_FUNCTION or '>' in dax_formula or '<' in dax_formula
+        ):
             return "FILTER"
-        
+
         # Aggregation functions
-        agg_keywords = ['SUM', 'COUNT', 'AVG', 'AVERAGE', 'MAX', 'MIN', 'DISTINCTCOUNT']
-        if any(keyword in dax_upper for keyword in agg_keywords):
+        if categories & _AGGREGATION:
             return "AGGREGATION"
-        
+
         # Default to calculation
         return "CALCULATION"
+
+
+def _parse_measure_item(item: Tuple[str, str]) -> ParsedRule:
+    """Parse one (name, formula) pair (module-level so it can be pickled)."""
+    return DAXParser.parse_measure(*item)
+
+
+# Shared parser instance
+parser = DAXParser()
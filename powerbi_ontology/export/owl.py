@@ -81,13 +81,19 @@ class OWLExporter:
         Export ontology to OWL/RDF format.
 
         Args:
-            format: Output format ("xml", "turtle", "json-ld", "n3")
+            format: Output format ("xml", "turtle", "json-ld", "n3", "nt")
 
         Returns:
             OWL/RDF string
         """
         logger.info(f"Exporting ontology '{self.ontology.name}' to OWL format ({format})")
+        self._build_graph()
 
+        # Serialize to requested format
+        return self.graph.serialize(format=format)
+
+    def _build_graph(self) -> None:
+        """Add the ontology's metadata, classes, properties and rules to the graph."""
         # Add ontology metadata
         self._add_ontology_metadata()
 
@@ -108,9 +114,6 @@ class OWLExporter:
             self._add_business_rules()
             self._add_default_crud_actions()
 
-        # Serialize to requested format
-        return self.graph.serialize(format=format)
-
     def _add_ontology_metadata(self):
         """Add ontology-level metadata."""
         ontology_uri = URIRef(self.base_uri.rstrip("#"))
@@ -505,9 +508,11 @@ class OWLExporter:
             filepath: Path to save file (UTF-8 encoded)
             format: Output format (xml, turtle, json-ld, n3)
         """
-        output = self.export(format=format)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(output)
+        logger.info(f"Exporting ontology '{self.ontology.name}' to OWL format ({format})")
+        self._build_graph()
+        # Serialize straight into the file as UTF-8 bytes instead of building
+        # the whole document as a str and encoding it again on write.
+        self.graph.serialize(destination=filepath, format=format, encoding="utf-8")
         logger.info(f"Saved OWL export to {filepath}")
 
     def get_export_summary(self) -> dict:
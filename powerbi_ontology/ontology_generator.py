@@ -9,7 +9,7 @@ import logging
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
-from powerbi_ontology.dax_parser import DAXParser
+from powerbi_ontology.dax_parser import parser as dax_parser
 from powerbi_ontology.extractor import SemanticModel, Entity, Relationship, Measure
 
 logger = logging.getLogger(__name__)
@@ -133,7 +133,7 @@ class OntologyGenerator:
             semantic_model: Extracted semantic model from Power BI
         """
         self.semantic_model = semantic_model
-        self.dax_parser = DAXParser()
+        self.dax_parser = dax_parser
 
     def generate(self) -> Ontology:
         """
@@ -163,8 +163,11 @@ class OntologyGenerator:
         ]
         
         # Map measures to business rules
-        for measure in self.semantic_model.measures:
-            parsed = self.dax_parser.parse_measure(measure.name, measure.dax_formula)
+        measures = self.semantic_model.measures
+        parsed_measures = self.dax_parser.parse_measures(
+            (measure.name, measure.dax_formula) for measure in measures
+        )
+        for measure, parsed in zip(measures, parsed_measures):
             for rule in parsed.business_rules:
                 ontology.business_rules.append(
                     self.map_measure_to_rule(measure, rule)
@@ -0,0 +1,26 @@
+"""
+Python version compatibility helpers
+"""
+
+import sys
+from typing import Any, Dict
+
+
+def dataclass_options(frozen: bool = False) -> Dict[str, Any]:
+    """
+    Keyword arguments for ``@dataclass``.
+
+    Adds ``slots=True`` (no per-instance ``__dict__``) on Python 3.10+, the
+    first version whose dataclasses support it; older versions get plain
+    dataclasses.
+
+    Args:
+        frozen: Make instances immutable
+
+    Returns:
+        Options to pass as ``@dataclass(**dataclass_options(...))``
+    """
+    options: Dict[str, Any] = {"frozen": frozen}
+    if sys.version_info >= (3, 10):
+        options["slots"] = True
+    return options
@@ -0,0 +1,106 @@
+"""
+JSON helpers
+
+Uses orjson (Rust, SIMD) for parsing and serialization when it is installed
+and falls back to the standard library json module otherwise.
+"""
+
+import codecs
+import dataclasses
+import json
+import mmap
+import os
+from typing import Any, Union
+
+# orjson is an optional speedup: pip install powerbi-ontology-extractor[fast]
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError is a subclass of json.JSONDecodeError, so callers can
+# catch this regardless of the backend in use.
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[bytes, memoryview, str]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: UTF-8 encoded bytes or memoryview (a leading BOM is ignored),
+            or str
+
+    Returns:
+        Parsed JSON value
+    """
+    if isinstance(data, (bytes, memoryview)) and data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+        data = data[len(codecs.BOM_UTF8):]
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _dataclass_default(obj: Any) -> Any:
+    """Serialize dataclass instances for the stdlib backend (orjson does this natively)."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize a value to UTF-8 encoded JSON.
+
+    Dataclass instances are serialized as objects of their fields, so nested
+    dataclasses (e.g. an Ontology) can be written without converting them to
+    dicts first. Non-ASCII characters are written as-is rather than escaped,
+    with either backend.
+
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        UTF-8 encoded JSON document
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False, default=_dataclass_default
+    ).encode("utf-8")
+
+
+def load_path(path: Union[str, os.PathLike]) -> Any:
+    """
+    Parse a UTF-8 JSON file.
+
+    The file is memory-mapped rather than read into a bytes object, so with
+    orjson large files (e.g. a multi-hundred-MB model.bim) are parsed straight
+    from the page cache without an extra in-memory copy.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        Parsed JSON value
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Strip the BOM here, in a view released before the mmap closes:
+            # a slice taken inside loads() would stay referenced from the
+            # traceback of a parse error and make mmap.close() raise
+            # BufferError instead.
+            bom = codecs.BOM_UTF8
+            start = len(bom) if mapped[:len(bom)] == bom else 0
+            with memoryview(mapped) as view, view[start:] as body:
+                return loads(body)
@@ -5,13 +5,14 @@ Reads Power BI .pbix files using PBIXRay library to parse binary DataModel.
 Supports both modern .pbix files (binary DataModel) and legacy files (model.bim JSON).
 """
 
-import json
 import logging
 import tempfile
 import zipfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from powerbi_ontology.utils import json_io
+
 logger = logging.getLogger(__name__)
 
 # Try to import pbixray for modern .pbix parsing
@@ -166,11 +167,10 @@ class PBIXReader:
                 )
 
         try:
-            with open(model_path, 'r', encoding='utf-8') as f:
-                self._model_data = json.load(f)
+            self._model_data = json_io.load_path(model_path)
             logger.info(f"Successfully read model.bim from {model_path}")
             return self._model_data
-        except json.JSONDecodeError as e:
+        except json_io.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in model.bim: {e}")
         except Exception as e:
             raise RuntimeError(f"Failed to read model.bim: {e}")
@@ -550,7 +550,7 @@ class PBIXReader:
                     with open(layout_path, 'rb') as f:
                         content = f.read()
                     text = content.decode('utf-16-le')
-                    return json.loads(text)
+                    return json_io.loads(text)
                 except Exception as e:
                     logger.warning(f"Failed to read Layout: {e}")
 
@@ -558,8 +558,7 @@ class PBIXReader:
             return None
 
         try:
-            with open(report_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json_io.load_path(report_path)
         except Exception as e:
             logger.warning(f"Failed to read report.json: {e}")
             return None
@@ -2,8 +2,14 @@
 Tests for SemanticAnalyzer class.
 """
 
+import copy
+import dataclasses
+import gc
+import weakref
+
 import pytest
 
+from powerbi_ontology.extractor import SemanticModel, Measure
 from powerbi_ontology.analyzer import (
     SemanticAnalyzer, Conflict, Duplication, CanonicalEntity, SemanticDebtReport
 )
@@ -15,8 +21,14 @@ class TestSemanticAnalyzer:
     def test_init(self, multiple_semantic_models):
         """Test analyzer initialization."""
         analyzer = SemanticAnalyzer(multiple_semantic_models)
-        assert len(analyzer.semantic_models) == 2
-        assert len(analyzer._model_map) == 2
+        assert analyzer.model_count == 2
+        assert analyzer.semantic_models == []
+    
+    def test_init_keep_models(self, multiple_semantic_models):
+        """Test that models are retained only when requested."""
+        analyzer = SemanticAnalyzer(multiple_semantic_models, keep_models=True)
+        assert analyzer.semantic_models == multiple_semantic_models
+        assert analyzer.model_count == 2
     
     def test_detect_conflicts(self, multiple_semantic_models):
         """Test conflict detection across dashboards."""
@@ -156,3 +168,85 @@ class TestSemanticAnalyzer:
             # Confidence should be based on usage frequency
             assert 0.0 <= canon.confidence <= 1.0
             assert len(canon.dashboards_using) > 0
+    
+    def test_detect_conflicts_skips_identical_definitions(self):
+        """Test that only pairs with different definitions are reported."""
+        models = [
+            SemanticModel(
+                name=f"Model{i}",
+                source_file=f"dashboard{i}.pbix",
+                measures=[Measure(name="Revenue", dax_formula=formula)],
+            )
+            for i, formula in enumerate([
+                "SUM(Sales[Amount])",
+                "SUM(Sales[Amount])",
+                "SUM(Sales[Net])",
+            ])
+        ]
+        analyzer = SemanticAnalyzer(models)
+        conflicts = analyzer.detect_conflicts()
+        
+        pairs = [(c.dashboard1, c.dashboard2) for c in conflicts]
+        assert pairs == [
+            ("dashboard0.pbix", "dashboard2.pbix"),
+            ("dashboard1.pbix", "dashboard2.pbix"),
+        ]
+    
+    def test_detect_conflicts_is_cached(self, multiple_semantic_models):
+        """Test that repeated analysis reuses the first conflict detection."""
+        analyzer = SemanticAnalyzer(multiple_semantic_models)
+        first = analyzer.detect_conflicts()
+        first.clear()
+        
+        second = analyzer.detect_conflicts()
+        assert len(second) > 0
+        assert analyzer.calculate_semantic_debt().total_conflicts == len(second)
+    
+    def test_add_model_incrementally(self, multiple_semantic_models):
+        """Test that models added one by one match constructor input."""
+        analyzer = SemanticAnalyzer()
+        assert analyzer.detect_conflicts() == []
+        
+        for model in multiple_semantic_models:
+            analyzer.add_model(model)
+        
+        expected = SemanticAnalyzer(multiple_semantic_models).detect_conflicts()
+        assert analyzer.model_count == 2
+        assert analyzer.detect_conflicts() == expected
+    
+    def test_init_accepts_generator(self, multiple_semantic_models):
+        """Test that the analyzer can consume models from a generator."""
+        analyzer = SemanticAnalyzer(m for m in multiple_semantic_models)
+        assert analyzer.model_count == 2
+        assert len(analyzer.detect_conflicts()) > 0
+    
+    def test_add_model_does_not_retain_model(self, multiple_semantic_models):
+        """Test that an added model can be freed while its analysis remains."""
+        analyzer = SemanticAnalyzer()
+        model = copy.deepcopy(multiple_semantic_models[0])
+        model_ref = weakref.ref(model)
+        analyzer.add_model(model)
+        for other in multiple_semantic_models[1:]:
+            analyzer.add_model(other)
+        
+        del model
+        gc.collect()
+        
+        assert model_ref() is None
+        assert len(analyzer.detect_conflicts()) > 0
+    
+    def test_iter_conflicts_matches_detect_conflicts(self, multiple_semantic_models):
+        """Test that lazy iteration yields the same conflicts in order."""
+        analyzer = SemanticAnalyzer(multiple_semantic_models)
+        lazy = list(analyzer.iter_conflicts())
+        
+        assert lazy == analyzer.detect_conflicts()
+        assert list(analyzer.iter_conflicts()) == lazy
+    
+    def test_conflicts_are_immutable(self, multiple_semantic_models):
+        """Test that analysis results cannot be modified after creation."""
+        analyzer = SemanticAnalyzer(multiple_semantic_models)
+        conflict = analyzer.detect_conflicts()[0]
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            conflict.severity = "LOW"
@@ -0,0 +1,347 @@
+"""
+Tests for Ontology Chat module.
+
+Covers the parts that do not call the LLM:
+- OpenAI client creation and sharing
+- Ontology context building
+- Suggestions
+"""
+
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from powerbi_ontology import chat as chat_module
+from powerbi_ontology.chat import ChatSession, OntologyChat, count_tokens, create_chat
+from powerbi_ontology.ontology_generator import (
+    Ontology,
+    OntologyEntity,
+    OntologyProperty,
+    OntologyRelationship,
+    BusinessRule,
+)
+
+
+@pytest.fixture
+def chat_ontology():
+    """Small ontology for chat tests."""
+    return Ontology(
+        name="Sales",
+        version="1.0",
+        source="Sales.pbix",
+        entities=[
+            OntologyEntity(
+                name="Customer",
+                description="Customer master data",
+                properties=[OntologyProperty(name="CustomerId", data_type="Integer")],
+            ),
+            OntologyEntity(name="Order"),
+        ],
+        relationships=[
+            OntologyRelationship(
+                from_entity="Order",
+                from_property="CustomerId",
+                to_entity="Customer",
+                to_property="CustomerId",
+                relationship_type="belongs_to",
+                cardinality="many-to-one",
+            ),
+        ],
+        business_rules=[
+            BusinessRule(name="HighValue", entity="Order", condition="Amount > 1000"),
+        ],
+    )
+
+
+@pytest.fixture
+def fake_openai():
+    """Replace openai.OpenAI with a mock and reset the shared client cache."""
+    openai = pytest.importorskip("openai")
+    chat_module._get_openai_client.cache_clear()
+    with patch.object(openai, "OpenAI", side_effect=lambda **kwargs: MagicMock()) as mock_cls:
+        yield mock_cls
+    chat_module._get_openai_client.cache_clear()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+def test_chat_dataclasses_use_slots():
+    """Test that chat messages and sessions have no per-instance __dict__."""
+    session = ChatSession()
+    msg = session.add_message("user", "hi")
+
+    assert not hasattr(msg, "__dict__")
+    assert not hasattr(session, "__dict__")
+
+
+class TestOpenAIClient:
+    """Test lazy OpenAI client creation."""
+
+    def test_client_shared_between_chats(self, fake_openai):
+        """Test that chats with the same settings reuse one client."""
+        first = OntologyChat(api_key="sk-test")
+        second = OntologyChat(api_key="sk-test")
+
+        assert first._get_client() is second._get_client()
+        assert fake_openai.call_count == 1
+        # History is still per chat
+        assert first.session is not second.session
+
+    def test_client_per_settings(self, fake_openai):
+        """Test that different keys or endpoints get separate clients."""
+        openai_chat = OntologyChat(api_key="sk-a")
+        other_key = OntologyChat(api_key="sk-b")
+        local = OntologyChat(api_key="sk-a", base_url="http://localhost:11434/v1")
+
+        clients = {id(c._get_client()) for c in (openai_chat, other_key, local)}
+        assert len(clients) == 3
+
+    def test_empty_model_env_uses_default(self, monkeypatch):
+        """Test that an empty OPENAI_MODEL does not produce an empty model name."""
+        monkeypatch.setenv("OPENAI_MODEL", "")
+        assert OntologyChat(api_key="sk-test").model == "gpt-4o-mini"
+
+        monkeypatch.setenv("OPENAI_MODEL", "gpt-4o")
+        assert OntologyChat(api_key="sk-test").model == "gpt-4o"
+        assert OntologyChat(api_key="sk-test", model="llama3").model == "llama3"
+
+    def test_missing_api_key_raises(self, monkeypatch):
+        """Test that a missing key is reported before any client is created."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.delenv("OLLAMA_BASE_URL", raising=False)
+        chat = create_chat()
+
+        with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+            chat._get_client()
+
+
+class TestContextAndSuggestions:
+    """Test context building and suggested questions."""
+
+    def test_build_context(self, chat_ontology):
+        """Test that the context lists entities, relationships and rules."""
+        context = OntologyChat(api_key="sk-test").build_context(chat_ontology)
+
+        assert "Sales v1.0" in context
+        assert "Customer (standard): CustomerId" in context
+        assert "Order.CustomerId → Customer.CustomerId (belongs_to, many-to-one)" in context
+        assert "HighValue" in context
+        assert "Amount > 1000" in context
+
+    def test_get_suggestions(self, chat_ontology):
+        """Test that suggestions mention the first entities."""
+        suggestions = OntologyChat(api_key="sk-test").get_suggestions(chat_ontology)
+
+        assert 0 < len(suggestions) <= 6
+        assert any("Customer" in s and "Order" in s for s in suggestions)
+
+    def test_get_suggestions_cached(self, chat_ontology):
+        """Test that suggestions are reused until the first entities change."""
+        chat = OntologyChat(api_key="sk-test")
+        with patch.object(chat, "_build_suggestions", wraps=chat._build_suggestions) as build:
+            first = chat.get_suggestions(chat_ontology)
+            assert chat.get_suggestions(chat_ontology, max_n=2) == first[:2]
+            assert build.call_count == 1
+
+            chat_ontology.entities[0].name = "Client"
+            assert any("Client" in s for s in chat.get_suggestions(chat_ontology))
+            assert build.call_count == 2
+
+
+class TestPromptCache:
+    """Test reuse of the system prompt between questions."""
+
+    @pytest.fixture
+    def chat(self):
+        """Chat with a mocked client that always answers 'ok'."""
+        chat = OntologyChat(api_key="sk-test")
+        chat._min_request_interval = 0.0
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = "ok"
+        chat._client = client
+        return chat
+
+    def test_context_built_once(self, chat, chat_ontology):
+        """Test that repeated questions reuse the built context."""
+        with patch.object(chat, "build_context", wraps=chat.build_context) as build:
+            chat.ask("first?", chat_ontology)
+            chat.ask("second?", chat_ontology)
+
+        assert build.call_count == 1
+        calls = chat._client.chat.completions.create.call_args_list
+        first_context = calls[0].kwargs["messages"][1]["content"]
+        second_context = calls[1].kwargs["messages"][1]["content"]
+        assert first_context == second_context
+        assert "Customer" in first_context
+
+    def test_context_rebuilt_on_change(self, chat, chat_ontology):
+        """Test that a new ontology or changed counts rebuild the context."""
+        with patch.object(chat, "build_context", wraps=chat.build_context) as build:
+            chat.ask("q?", chat_ontology)
+            chat_ontology.entities.append(OntologyEntity(name="Product"))
+            chat.ask("q?", chat_ontology)
+            chat.ask("q?", Ontology(name="Other"))
+            chat.invalidate_context()
+            chat.ask("q?", Ontology(name="Other"))
+
+        assert build.call_count == 4
+
+    def test_prompt_per_role(self, chat, chat_ontology):
+        """Test that the user role is applied without rebuilding the context."""
+        with patch.object(chat, "build_context", wraps=chat.build_context) as build:
+            chat.ask("q?", chat_ontology, user_role="Analyst")
+            chat.ask("q?", chat_ontology, user_role="Admin")
+
+        assert build.call_count == 1
+        calls = chat._client.chat.completions.create.call_args_list
+        assert "Analyst" in calls[0].kwargs["messages"][2]["content"]
+        assert "Admin" in calls[1].kwargs["messages"][2]["content"]
+
+    def test_stable_prompt_prefix(self, chat, chat_ontology):
+        """Test that the instructions come first and do not vary per request."""
+        chat.ask("q?", chat_ontology, user_role="Analyst")
+        chat.ask("q?", Ontology(name="Other"), user_role="Admin")
+
+        calls = chat._client.chat.completions.create.call_args_list
+        first, second = (call.kwargs["messages"] for call in calls)
+        assert first[0] == second[0] == {"role": "system", "content": OntologyChat.SYSTEM_PROMPT}
+        assert first[1]["content"].startswith("КОНТЕКСТ ОНТОЛОГИИ:\n")
+        assert first[2] == {"role": "system", "content": "РОЛЬ ПОЛЬЗОВАТЕЛЯ: Analyst"}
+
+
+class TestAskMany:
+    """Test batching several questions into one request."""
+
+    @pytest.fixture
+    def chat(self):
+        """Chat with a mocked client whose replies are set per test."""
+        chat = OntologyChat(api_key="sk-test")
+        chat._min_request_interval = 0.0
+        chat._client = MagicMock()
+        return chat
+
+    def _reply(self, chat, *contents):
+        """Make the mocked client return the given replies in order."""
+        responses = []
+        for content in contents:
+            response = MagicMock()
+            response.choices[0].message.content = content
+            responses.append(response)
+        chat._client.chat.completions.create.side_effect = responses
+
+    def test_one_request_per_batch(self, chat, chat_ontology):
+        """Test that a numbered reply is split into one answer per question."""
+        self._reply(chat, "1) Two entities.\n\n2) Order belongs to Customer.\n3) One rule.")
+
+        answers = chat.ask_many(["Entities?", "Relationships?", "Rules?"], chat_ontology)
+
+        assert answers == ["Two entities.", "Order belongs to Customer.", "One rule."]
+        assert chat._client.chat.completions.create.call_count == 1
+        user_message = chat._client.chat.completions.create.call_args.kwargs["messages"][-1]
+        assert "1) Entities?\n2) Relationships?\n3) Rules?" in user_message["content"]
+        assert [m.content for m in chat.session.messages] == [
+            "Entities?", "Two entities.",
+            "Relationships?", "Order belongs to Customer.",
+            "Rules?", "One rule.",
+        ]
+
+    def test_batch_size(self, chat, chat_ontology):
+        """Test that questions are split into batches of batch_size."""
+        self._reply(chat, "1) a\n2) b", "1) c\n2) d", "e")
+
+        answers = chat.ask_many(["q1", "q2", "q3", "q4", "q5"], chat_ontology, batch_size=2)
+
+        assert answers == ["a", "b", "c", "d", "e"]
+        assert chat._client.chat.completions.create.call_count == 3
+
+    def test_fallback_when_numbering_is_wrong(self, chat, chat_ontology):
+        """Test that an unsplittable reply is re-asked question by question."""
+        self._reply(chat, "Both questions are about entities.", "first", "second")
+
+        answers = chat.ask_many(["q1", "q2"], chat_ontology)
+
+        assert answers == ["first", "second"]
+        assert chat._client.chat.completions.create.call_count == 3
+        assert len(chat.session.messages) == 4
+
+
+    def test_batch_max_tokens_capped(self, chat, chat_ontology):
+        """Test that a full batch does not request more than BATCH_MAX_TOKENS."""
+        self._reply(chat, "\n".join(f"{i}) a{i}" for i in range(1, 9)))
+
+        chat.ask_many([f"q{i}" for i in range(1, 9)], chat_ontology)
+
+        max_tokens = chat._client.chat.completions.create.call_args.kwargs["max_tokens"]
+        assert max_tokens == chat_module.BATCH_MAX_TOKENS
+
+    def test_fallback_when_batch_request_fails(self, chat, chat_ontology):
+        """Test that an API error on the batch re-asks question by question."""
+        first, second = MagicMock(), MagicMock()
+        first.choices[0].message.content = "first"
+        second.choices[0].message.content = "second"
+        chat._client.chat.completions.create.side_effect = [
+            RuntimeError("max_tokens is too large"), first, second,
+        ]
+
+        answers = chat.ask_many(["q1", "q2"], chat_ontology)
+
+        assert answers == ["first", "second"]
+        assert chat._client.chat.completions.create.call_count == 3
+
+
+class TestHistoryTokenBudget:
+    """Test trimming chat history to a token budget."""
+
+    def test_count_tokens_estimate_without_model(self):
+        """Test the four-characters-per-token estimate."""
+        assert count_tokens("") == 0
+        assert count_tokens("abcd") == 1
+        assert count_tokens("abcde") == 2
+
+    def test_messages_store_token_count(self):
+        """Test that tokens are counted once when a message is added."""
+        session = ChatSession()
+        msg = session.add_message("user", "x" * 40)
+
+        assert msg.token_count == 10
+
+    def test_get_history_max_tokens(self):
+        """Test that the oldest messages are dropped to fit the budget."""
+        session = ChatSession()
+        for content in ("a" * 400, "b" * 40, "c" * 40, "d" * 40):
+            session.add_message("user", content)
+
+        history = session.get_history(limit=10, max_tokens=30)
+
+        assert [m["content"][0] for m in history] == ["b", "c", "d"]
+        assert session.get_history(limit=2, max_tokens=1000) == session.get_history(limit=2)
+        assert session.get_history(limit=10, max_tokens=5) == []
+
+    def test_session_keeps_last_messages(self):
+        """Test that a session drops its oldest messages past MAX_HISTORY."""
+        session = ChatSession()
+        for i in range(ChatSession.MAX_HISTORY + 5):
+            session.add_message("user", str(i))
+
+        assert len(session.messages) == ChatSession.MAX_HISTORY
+        assert session.messages[0].content == "5"
+        assert session.get_history(limit=2) == [
+            {"role": "user", "content": str(ChatSession.MAX_HISTORY + 3)},
+            {"role": "user", "content": str(ChatSession.MAX_HISTORY + 4)},
+        ]
+        assert len(session.get_history(limit=0)) == ChatSession.MAX_HISTORY
+
+    def test_ask_applies_budget(self, chat_ontology):
+        """Test that a long earlier reply is not resent with the next question."""
+        chat = OntologyChat(api_key="sk-test")
+        chat._min_request_interval = 0.0
+        chat._client = MagicMock()
+        chat._client.chat.completions.create.return_value.choices[0].message.content = "ok"
+        chat.session.add_message("user", "short question")
+        chat.session.add_message("assistant", "long answer " * 2000)
+        chat.history_token_budget = 100
+
+        chat.ask("next?", chat_ontology)
+
+        messages = chat._client.chat.completions.create.call_args.kwargs["messages"]
+        assert [m["role"] for m in messages] == ["system", "system", "system", "user"]
@@ -9,6 +9,7 @@ Tests command-line interface functionality:
 """
 
 import json
+import os
 import pytest
 from pathlib import Path
 from click.testing import CliRunner
@@ -17,7 +18,14 @@ from powerbi_ontology.cli import (
     cli,
     _ontology_to_dict,
     _dict_to_ontology,
+    _add_batch_result,
+    _cache_key,
+    _new_batch_tables,
     _process_single_file,
+    _prune_cache,
+    _show_batch_results,
+    _store_cached_output,
+    _write_ontology_json,
 )
 from powerbi_ontology.ontology_generator import (
     Ontology,
@@ -152,6 +160,17 @@ class TestOntologyConversion:
 
         assert data == data2
 
+    def test_write_ontology_json_keeps_unicode(self, sample_ontology, tmp_path):
+        """Test that JSON output is UTF-8 without \\u escapes."""
+        sample_ontology.entities[0].description = "Клиент"
+        output_file = tmp_path / "ontology.json"
+
+        _write_ontology_json(sample_ontology, output_file)
+
+        text = output_file.read_text(encoding="utf-8")
+        assert "Клиент" in text
+        assert json.loads(text) == _ontology_to_dict(sample_ontology)
+
     def test_dict_to_ontology_minimal(self):
         """Test conversion with minimal data."""
         data = {
@@ -231,6 +250,29 @@ class TestDiffCommand:
 
         assert result.exit_code == 0
 
+    def test_diff_json_output_file(self, runner, sample_ontology, tmp_path):
+        """Test that a JSON diff written to a file is valid JSON."""
+        source_data = _ontology_to_dict(sample_ontology)
+        target_data = _ontology_to_dict(sample_ontology)
+        target_data["entities"][0]["description"] = "Клиент"
+        source_file = tmp_path / "source.json"
+        target_file = tmp_path / "target.json"
+        output_file = tmp_path / "diff.json"
+        source_file.write_text(json.dumps(source_data))
+        target_file.write_text(json.dumps(target_data))
+
+        result = runner.invoke(cli, [
+            "diff",
+            "--source", str(source_file),
+            "--target", str(target_file),
+            "--format", "json",
+            "--output", str(output_file),
+        ])
+
+        assert result.exit_code == 0
+        report = json.loads(output_file.read_text(encoding="utf-8"))
+        assert report["summary"]["total_changes"] > 0
+
 
 class TestAnalyzeCommand:
     """Tests for analyze command."""
@@ -281,6 +323,22 @@ class TestAnalyzeCommand:
 
         assert result.exit_code == 0
 
+    def test_analyze_skips_unreadable_files(self, runner, sample_ontology, tmp_path):
+        """Test that a broken file is reported and the others are analyzed."""
+        data = _ontology_to_dict(sample_ontology)
+        (tmp_path / "ont1.json").write_text(json.dumps(data))
+        (tmp_path / "ont2.json").write_text(json.dumps(data))
+        (tmp_path / "broken.json").write_text("{not json")
+
+        result = runner.invoke(cli, [
+            "analyze",
+            "--input", str(tmp_path),
+        ])
+
+        assert result.exit_code == 0
+        assert "Could not load broken.json" in result.output
+        assert "Analyzing 3 ontologies" in result.output
+
 
 class TestBatchCommand:
     """Tests for batch command."""
@@ -311,6 +369,57 @@ class TestBatchCommand:
 
         assert output_dir.exists()
 
+    def test_batch_reports_failed_files(self, runner, tmp_path):
+        """Test that failures in worker processes are reported per file."""
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for name in ("a.pbix", "b.pbix"):
+            (input_dir / name).write_text("not a real pbix file")
+
+        result = runner.invoke(cli, [
+            "batch",
+            "--input", str(input_dir),
+            "--output", str(tmp_path / "output"),
+            "--workers", "2",
+            "--no-cache",
+        ])
+
+        assert result.exit_code == 0
+        assert "Failed (2 files)" in result.output
+
+    @pytest.mark.parametrize("workers", ["0", "-1"])
+    def test_batch_rejects_invalid_workers(self, runner, tmp_path, workers):
+        """Test that a worker count below 1 is a usage error."""
+        result = runner.invoke(cli, [
+            "batch",
+            "--input", str(tmp_path),
+            "--output", str(tmp_path / "output"),
+            "--workers", workers,
+        ])
+
+        assert result.exit_code == 2
+        assert "--workers" in result.output
+
+    def test_batch_result_tables(self, capsys):
+        """Test that results are shown in the success and failure tables."""
+        success_table, failed_table = _new_batch_tables()
+        _add_batch_result(success_table, failed_table, {
+            "success": True, "file": "a.pbix", "output": "out/a.json",
+            "entities": 3, "relationships": 2, "cached": True,
+        })
+        _add_batch_result(success_table, failed_table, {
+            "success": False, "file": "b.pbix", "error": "bad file",
+        })
+
+        _show_batch_results(success_table, failed_table)
+
+        output = capsys.readouterr().out
+        assert "Successfully Processed (1 files)" in output
+        assert "a.json (cached)" in output
+        assert "Failed (1 files)" in output
+        assert "bad file" in output
+        assert "50.0%" in output
+
 
 class TestExtractCommand:
     """Tests for extract command."""
@@ -341,3 +450,79 @@ class TestProcessSingleFile:
 
         assert result["success"] is False
         assert "error" in result
+
+    def test_process_uses_cached_output(self, tmp_path):
+        """Test that an unchanged file is served from the cache without extraction."""
+        pbix = tmp_path / "report.pbix"
+        pbix.write_bytes(b"pbix content")
+        cache_dir = tmp_path / "cache"
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        cached_json = tmp_path / "cached.json"
+        cached_json.write_text('{"name": "Cached"}')
+        cache_key = _cache_key(pbix, "json")
+        _store_cached_output(cache_dir, cache_key, ".json", cached_json, {"entities": 3, "relationships": 2})
+
+        result = _process_single_file(pbix, output_dir, "json", cache_dir)
+
+        assert result["success"] is True
+        assert result["cached"] is True
+        assert result["entities"] == 3
+        assert (output_dir / "report.json").read_text() == '{"name": "Cached"}'
+
+    def test_process_cache_miss_on_changed_file(self, tmp_path):
+        """Test that changed content is not served from the cache."""
+        pbix = tmp_path / "report.pbix"
+        pbix.write_bytes(b"pbix content")
+        cache_dir = tmp_path / "cache"
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        cached_json = tmp_path / "cached.json"
+        cached_json.write_text("{}")
+        cache_key = _cache_key(pbix, "json")
+        _store_cached_output(cache_dir, cache_key, ".json", cached_json, {"entities": 3, "relationships": 2})
+        pbix.write_bytes(b"changed pbix content")
+
+        result = _process_single_file(pbix, output_dir, "json", cache_dir)
+
+        # Falls through to real extraction, which fails on the fake file
+        assert result["success"] is False
+        assert not (output_dir / "report.json").exists()
+
+    def test_process_cache_miss_on_moved_file(self, tmp_path):
+        """Test that a copy at another path does not reuse the original's output."""
+        pbix = tmp_path / "report.pbix"
+        pbix.write_bytes(b"pbix content")
+        copy = tmp_path / "copy" / "report.pbix"
+        copy.parent.mkdir()
+        copy.write_bytes(b"pbix content")
+        cache_dir = tmp_path / "cache"
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        cached_json = tmp_path / "cached.json"
+        cached_json.write_text('{"source": "Power BI: report.pbix"}')
+        _store_cached_output(cache_dir, _cache_key(pbix, "json"), ".json", cached_json, {"entities": 3, "relationships": 2})
+
+        assert _cache_key(copy, "json") != _cache_key(pbix, "json")
+        result = _process_single_file(copy, output_dir, "json", cache_dir)
+
+        assert "cached" not in result
+        assert not (output_dir / "report.json").exists()
+
+    def test_prune_cache_keeps_recent_entries(self, tmp_path):
+        """Test that pruning deletes the least recently used entries."""
+        cache_dir = tmp_path / "cache"
+        output = tmp_path / "out.json"
+        output.write_text("{}")
+        for i, key in enumerate(["old", "mid", "new"]):
+            _store_cached_output(cache_dir, key, ".json", output, {"entities": i})
+            os.utime(cache_dir / f"{key}.stats.json", (1000 + i, 1000 + i))
+
+        _prune_cache(cache_dir, 2)
+
+        assert sorted(p.name for p in cache_dir.iterdir()) == [
+            "mid.json", "mid.stats.json", "new.json", "new.stats.json",
+        ]
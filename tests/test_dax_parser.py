@@ -2,9 +2,11 @@
 Tests for DAXParser class.
 """
 
+import dataclasses
+
 import pytest
 
-from powerbi_ontology.dax_parser import DAXParser, ParsedRule, BusinessRule
+from powerbi_ontology.dax_parser import DAXParser, ParsedRule, BusinessRule, parser as shared_parser
 from tests.fixtures.test_data import (
     SIMPLE_DAX_SUM, CONDITIONAL_DAX, SWITCH_DAX, CALCULATE_FILTER_DAX, TIME_INTELLIGENCE_DAX
 )
@@ -126,6 +128,16 @@ class TestDAXParser:
         assert "Customers.RiskScore" in deps
         assert "Products.Category" in deps
     
+    def test_identify_dependencies_table_only(self):
+        """Test that Table.* is reported only without a plain column name."""
+        parser = DAXParser()
+        dax = "SUM(Orders[OrderValue]) + SUM(Sales[Net Amount])"
+        
+        deps = parser.identify_dependencies(dax)
+        
+        assert deps == {"Orders.OrderValue", "Sales.*"}
+        assert parser.identify_dependencies("Switch[Risk Level] + Values[Net]") == {"Values.Net"}
+    
     def test_classify_measure_type_aggregation(self):
         """Test classifying aggregation measures."""
         parser = DAXParser()
@@ -220,6 +232,44 @@ class TestDAXParser:
         conditions = [rule.condition for rule in rules]
         assert any("Temperature" in cond for cond in conditions) or any("25" in cond for cond in conditions)
     
+    def test_nested_calls(self):
+        """Test that arguments with nested calls are not cut at inner commas."""
+        parser = DAXParser()
+
+        rules = parser.extract_business_logic(
+            "Avg Price", "IF(Sales[Qty] > 10, DIVIDE(Sales[Amount], Sales[Qty]), 0)"
+        )
+        assert rules[0].condition == "Sales[Qty] > 10"
+        assert rules[0].classification == "DIVIDE(Sales[Amount], Sales[Qty])"
+
+        rules = parser.extract_business_logic(
+            "Red 2024",
+            'CALCULATE(CALCULATE(SUM(Sales[Amount]), Product[Color]="Red"), Date[Year]=2024)',
+        )
+        assert [r.condition for r in rules] == ['Date[Year]=2024', 'Product[Color]="Red"']
+
+    def test_split_args(self):
+        """Test splitting call arguments."""
+        text = 'SWITCH(TRUE(), Sales[Amount (USD)] > 1000, "Big, really", "Other") + 1'
+
+        args, end = DAXParser._split_args(text, len("SWITCH("))
+
+        assert args == ["TRUE()", "Sales[Amount (USD)] > 1000", '"Big, really"', '"Other"']
+        assert text[end:] == " + 1"
+        assert DAXParser._split_args("SUM(Sales[Amount]", 4) == (["Sales[Amount]"], -1)
+    
+    def test_threshold_dedup_by_field_name(self):
+        """Test that thresholds are skipped only for fields already compared."""
+        parser = DAXParser()
+
+        rules = parser.extract_business_logic(
+            "Risk", "CALCULATE(COUNT(Customers[Id]), RiskScore > 80) + Score > 10"
+        )
+        assert [r.condition for r in rules] == ["RiskScore > 80", "Score > 10"]
+
+        rules = parser.extract_business_logic("Amount", "Amount > 1 || Amount > 5")
+        assert [r.condition for r in rules] == ["Amount > 1"]
+    
     @pytest.mark.parametrize("dax,expected_type", [
         ("SUM(Orders[Value])", "AGGREGATION"),
         ("IF(Risk > 80, 'High', 'Low')", "CONDITIONAL"),
@@ -232,3 +282,88 @@ class TestDAXParser:
         parser = DAXParser()
         result = parser.classify_measure_type(dax)
         assert result == expected_type
+
+    @pytest.mark.parametrize("dax,expected_type", [
+        ("IFERROR(DIVIDE(Sales[A], Sales[B]), 0)", "CALCULATION"),
+        ("Sales[DIFFERENCE] - Sales[Net]", "CALCULATION"),
+        ("Sales[SUM_Amount] * 2", "CALCULATION"),
+        ("SUMX(Sales, Sales[Qty] * Sales[Price])", "AGGREGATION"),
+        ("countrows(Sales)", "AGGREGATION"),
+        ("calculate(sum(Sales[Amount]), filter(Sales, Sales[Qty] = 1))", "FILTER"),
+        ("Switch (TRUE(), Sales[Qty] = 1, 1, 0)", "CONDITIONAL"),
+    ])
+    def test_classify_matches_whole_function_names(self, dax, expected_type):
+        """Test that only called functions, not substrings, decide the type."""
+        parser = DAXParser()
+        assert parser.classify_measure_type(dax) == expected_type
+
+
+class TestParseMeasureCache:
+    """Test caching of parsed measures."""
+
+    def test_repeated_measure_is_cached(self):
+        """Test that the same name and formula are parsed only once."""
+        DAXParser.parse_measure.cache_clear()
+        parser = DAXParser()
+
+        first = parser.parse_measure("High Risk", CONDITIONAL_DAX)
+        second = parser.parse_measure("High Risk", CONDITIONAL_DAX)
+        other = parser.parse_measure("Other", CONDITIONAL_DAX)
+
+        assert second is first
+        assert other is not first
+        assert other.business_rules[0].name.startswith("Other")
+        assert DAXParser.parse_measure.cache_info().hits == 1
+
+        DAXParser.parse_measure.cache_clear()
+        assert parser.parse_measure("High Risk", CONDITIONAL_DAX) is not first
+
+    def test_cache_shared_between_parsers(self):
+        """Test that every parser instance reuses the same cached results."""
+        DAXParser.parse_measure.cache_clear()
+
+        first = DAXParser().parse_measure("High Risk", CONDITIONAL_DAX)
+
+        assert DAXParser().parse_measure("High Risk", CONDITIONAL_DAX) is first
+        assert shared_parser.parse_measure("High Risk", CONDITIONAL_DAX) is first
+
+    def test_parsed_rule_is_immutable(self):
+        """Test that cached results cannot be modified by callers."""
+        parsed = DAXParser().parse_measure("High Risk", CONDITIONAL_DAX)
+
+        assert isinstance(parsed.business_rules, tuple)
+        assert isinstance(parsed.dependencies, frozenset)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            parsed.measure_type = "CALCULATION"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            parsed.business_rules[0].condition = ""
+
+
+class TestParseMeasures:
+    """Test parsing measures in batches."""
+
+    MEASURES = [
+        ("High Risk", CONDITIONAL_DAX),
+        ("Revenue", SIMPLE_DAX_SUM),
+        ("High Risk", CONDITIONAL_DAX),
+        ("Shipment Risk", SWITCH_DAX),
+    ]
+
+    def test_matches_parse_measure(self):
+        """Test that batch results match single parses, in input order."""
+        parsed = DAXParser.parse_measures(iter(self.MEASURES))
+
+        assert parsed == [DAXParser.parse_measure(n, f) for n, f in self.MEASURES]
+        assert parsed[0] is parsed[2]
+
+    def test_worker_processes(self, monkeypatch):
+        """Test that large batches can be parsed in worker processes."""
+        from powerbi_ontology import dax_parser
+
+        monkeypatch.setattr(dax_parser, "PARALLEL_PARSE_THRESHOLD", 2)
+        monkeypatch.setattr(dax_parser, "PARALLEL_PARSE_CHUNK_SIZE", 1)
+
+        parsed = DAXParser.parse_measures(self.MEASURES, max_workers=2)
+
+        assert parsed == DAXParser.parse_measures(self.MEASURES)
+        assert parsed[0] is parsed[2]
@@ -69,6 +69,15 @@ class TestOWLExporter:
         assert isinstance(owl_turtle, str)
         assert len(owl_turtle) > 0
 
+    def test_export_ntriples(self, sample_ontology):
+        """Test exporting to N-Triples (editor fast mode)."""
+        exporter = OWLExporter(sample_ontology)
+        owl_nt = exporter.export(format="nt")
+
+        lines = [line for line in owl_nt.splitlines() if line.strip()]
+        assert len(lines) == len(exporter.graph)
+        assert all(line.endswith(" .") for line in lines)
+
     def test_add_entity(self, sample_ontology):
         """Test adding entity as OWL class."""
         exporter = OWLExporter(sample_ontology)
@@ -0,0 +1,130 @@
+"""
+Tests for JSON helpers.
+"""
+
+import codecs
+from dataclasses import dataclass, field
+from unittest.mock import patch
+
+import pytest
+
+from powerbi_ontology.utils import json_io
+
+
+@dataclass
+class _Child:
+    name: str
+    value: int = 0
+
+
+@dataclass
+class _Parent:
+    name: str
+    children: list = field(default_factory=list)
+
+
+class TestLoads:
+    """Test json_io.loads with and without orjson."""
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+    def backend(self, request):
+        """Run each test with both JSON backends."""
+        if request.param and not json_io.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        with patch.object(json_io, "ORJSON_AVAILABLE", request.param):
+            yield
+
+    def test_loads_bytes(self, backend):
+        """Test parsing UTF-8 bytes."""
+        assert json_io.loads('{"name": "Продажи"}'.encode("utf-8")) == {"name": "Продажи"}
+
+    def test_loads_str(self, backend):
+        """Test parsing a str."""
+        assert json_io.loads('[1, 2, 3]') == [1, 2, 3]
+
+    def test_loads_strips_bom(self, backend):
+        """Test that a UTF-8 BOM is ignored."""
+        assert json_io.loads(codecs.BOM_UTF8 + b'{"a": 1}') == {"a": 1}
+
+    def test_loads_invalid_raises_json_decode_error(self, backend):
+        """Test that invalid JSON raises json_io.JSONDecodeError."""
+        with pytest.raises(json_io.JSONDecodeError):
+            json_io.loads(b"{not json")
+
+
+class TestDumps:
+    """Test json_io.dumps with and without orjson."""
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+    def backend(self, request):
+        """Run each test with both JSON backends."""
+        if request.param and not json_io.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        with patch.object(json_io, "ORJSON_AVAILABLE", request.param):
+            yield
+
+    def test_dumps_round_trip(self, backend):
+        """Test that dumped bytes parse back to the same value."""
+        data = {"name": "Продажи", "entities": [{"priority": 1, "required": True}]}
+        encoded = json_io.dumps(data)
+        assert isinstance(encoded, bytes)
+        assert json_io.loads(encoded) == data
+
+    def test_dumps_keeps_non_ascii(self, backend):
+        """Test that non-ASCII characters are not escaped."""
+        assert "Продажи".encode("utf-8") in json_io.dumps({"name": "Продажи"})
+
+    def test_dumps_indent(self, backend):
+        """Test two-space pretty printing."""
+        assert json_io.dumps({"a": [1]}, indent=True) == b'{\n  "a": [\n    1\n  ]\n}'
+
+    def test_dumps_nested_dataclasses(self, backend):
+        """Test that dataclasses serialize as objects of their fields."""
+        parent = _Parent("p", [_Child("c", 1)])
+        assert json_io.loads(json_io.dumps(parent)) == {
+            "name": "p", "children": [{"name": "c", "value": 1}],
+        }
+
+    def test_dumps_unsupported_type_raises(self, backend):
+        """Test that non-serializable objects raise TypeError."""
+        with pytest.raises(TypeError):
+            json_io.dumps({"a": object()})
+
+
+class TestLoadPath:
+    """Test json_io.load_path."""
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+    def backend(self, request):
+        """Run each test with both JSON backends."""
+        if request.param and not json_io.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        with patch.object(json_io, "ORJSON_AVAILABLE", request.param):
+            yield
+
+    def test_load_path_bom_invalid_raises_json_decode_error(self, temp_dir, backend):
+        """Test that invalid JSON after a BOM raises JSONDecodeError, not BufferError."""
+        path = temp_dir / "model.bim"
+        path.write_bytes(codecs.BOM_UTF8 + b"{bad")
+        with pytest.raises(json_io.JSONDecodeError):
+            json_io.load_path(path)
+
+    def test_load_path(self, temp_dir):
+        """Test parsing a JSON file."""
+        path = temp_dir / "model.bim"
+        path.write_bytes(codecs.BOM_UTF8 + '{"model": {"name": "Продажи"}}'.encode("utf-8"))
+        assert json_io.load_path(path) == {"model": {"name": "Продажи"}}
+
+    def test_load_path_stdlib_fallback(self, temp_dir):
+        """Test parsing a JSON file without orjson."""
+        path = temp_dir / "model.bim"
+        path.write_text('{"tables": []}', encoding="utf-8")
+        with patch.object(json_io, "ORJSON_AVAILABLE", False):
+            assert json_io.load_path(path) == {"tables": []}
+
+    def test_load_path_empty_file(self, temp_dir):
+        """Test that an empty file raises JSONDecodeError."""
+        path = temp_dir / "empty.json"
+        path.write_bytes(b"")
+        with pytest.raises(json_io.JSONDecodeError):
+            json_io.load_path(path)